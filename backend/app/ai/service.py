@@ -6,6 +6,7 @@ AI管理系统 - AI服务实现
 """
 
 import os
+import re
 import json
 import asyncio
 from typing import Dict, Any, Optional, List
@@ -18,6 +19,9 @@ from app.ai.monitor import get_ai_monitor
 
 settings = get_settings()
 
+# AI回复中的JSON块
+JSON_BLOCK_PATTERN = re.compile(r"\{[\s\S]*\}")
+
 class AIProvider(ABC):
     """AI提供商基类"""
     
@@ -303,11 +307,10 @@ class AIService:
         if result["success"]:
             try:
                 # 尝试解析JSON
-                import re
                 content = result["content"]
                 
                 # 查找JSON部分
-                json_match = re.search(r'\{[\s\S]*\}', content)
+                json_match = JSON_BLOCK_PATTERN.search(content)
                 if json_match:
                     json_str = json_match.group()
                     extracted_info = json.loads(json_str)
@@ -5,7 +5,8 @@ AI管理系统 - API路由包初始化
 定义API版本和通用响应格式
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from pydantic import BaseModel
 from app.schemas import ResponseBase, ResponseData
 
 # API版本信息
@@ -20,6 +21,10 @@ def success_response(data=None, message="操作成功"):
     else:
         return ResponseBase(success=True, message=message)
 
+def model_json_response(model: BaseModel) -> Response:
+    """直接用 pydantic-core 序列化为JSON响应 (跳过 response_model 校验和 jsonable_encoder)"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 def error_response(message="操作失败", status_code=400):
     """错误响应"""
     return ResponseBase(success=False, message=message)
@@ -7,22 +7,22 @@ AI管理系统 - 项目管理API
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload, undefer_group
 from sqlalchemy import and_, or_, func
 
 from app.database import get_db
-from app.models import Project, User, ProjectStatusLog
+from app.models import Project, User, ProjectStatusLog, Money, generate_project_number
 from app.schemas import (
-    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse,
+    ProjectCreate, ProjectUpdate,
     ProjectDetailResponse, ProjectStatusUpdate, PaginatedResponse,
-    PaginationMeta
+    PaginationMeta, PROJECT_ADAPTER, PROJECT_LIST_ADAPTER, PROJECT_LIST_ITEM_ADAPTER
 )
 from app.auth import get_current_active_user
 from app.permissions import (
     Permission, check_permission, check_project_access,
     check_project_modify, require_project_access, require_project_modify
 )
-from app.api import success_response, error_response, API_TAGS
+from app.api import success_response, error_response, model_json_response, API_TAGS
 from app import StatusEnum
 from datetime import datetime, date
 
@@ -40,6 +40,7 @@ async def get_projects(
     date_from: Optional[date] = Query(None, description="开始日期"),
     date_to: Optional[date] = Query(None, description="结束日期"),
     search: Optional[str] = Query(None, description="搜索关键词"),
+    compact: bool = Query(False, description="只返回列表视图字段 (编号/名称/状态/截止日期)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -82,13 +83,7 @@ async def get_projects(
     
     # 搜索筛选
     if search:
-        search_filter = or_(
-            Project.project_name.ilike(f"%{search}%"),
-            Project.customer_name.ilike(f"%{search}%"),
-            Project.project_number.ilike(f"%{search}%"),
-            Project.description.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        query = query.filter(Project.search_condition(search))
     
     # 获取总数
     total = query.count()
@@ -96,13 +91,23 @@ async def get_projects(
     
     # 分页查询
     skip = (page - 1) * page_size
-    projects = query.order_by(Project.created_at.desc()).offset(skip).limit(page_size).all()
+    query = query.order_by(Project.created_at.desc()).offset(skip).limit(page_size)
     
     # 转换为响应格式
-    project_list = []
-    for project in projects:
-        project_data = ProjectListResponse.model_validate(project)
-        project_list.append(project_data.model_dump())
+    if compact:
+        projects = query.options(load_only(
+            Project.id, Project.project_number, Project.project_name, Project.status, Project.deadline
+        )).all()
+        project_list = PROJECT_LIST_ITEM_ADAPTER.validate_python(projects, from_attributes=True)
+    else:
+        # ProjectResponse 包含关联用户和正文字段，随分页查询一并加载，避免逐行懒加载
+        projects = query.options(
+            joinedload(Project.creator),
+            joinedload(Project.designer),
+            joinedload(Project.sales),
+            undefer_group('project_text')
+        ).all()
+        project_list = PROJECT_LIST_ADAPTER.validate_python(projects, from_attributes=True)
     
     # 分页元数据
     meta = PaginationMeta(
@@ -112,12 +117,12 @@ async def get_projects(
         total_pages=total_pages
     )
     
-    return PaginatedResponse(
+    return model_json_response(PaginatedResponse(
         success=True,
         message=f"获取项目列表成功，共{total}个项目",
         data=project_list,
         meta=meta
-    )
+    ))
 
 @router.get("/{project_id}", response_model=ProjectDetailResponse)
 async def get_project(
@@ -127,7 +132,12 @@ async def get_project(
 ):
     """获取项目详情"""
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.query(Project).options(
+        undefer_group('project_text'),
+        selectinload(Project.tasks),
+        selectinload(Project.files),
+        selectinload(Project.status_logs)
+    ).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -169,7 +179,7 @@ async def get_project(
     )
 
 # 🆕 项目创建API
-@router.post("/", response_model=ProjectResponse)
+@router.post("/", response_model=None)
 async def create_project(
     project_data: ProjectCreate,
     current_user: User = Depends(get_current_active_user),
@@ -185,8 +195,7 @@ async def create_project(
         )
     
     # 生成项目编号
-    project_count = db.query(func.count(Project.id)).scalar()
-    project_number = f"PRJ{datetime.now().strftime('%Y%m%d')}{project_count + 1:03d}"
+    project_number = generate_project_number(db)
     
     # 创建项目
     db_project = Project(
@@ -212,26 +221,27 @@ async def create_project(
     db.flush()  # 获取ID
     
     # 记录状态变更日志
-    status_log = ProjectStatusLog(
+    ProjectStatusLog.queue(
+        db,
         project_id=db_project.id,
         user_id=current_user.id,
         from_status=None,
         to_status=StatusEnum.PENDING_QUOTE,
-        change_reason="项目创建",
-        created_at=datetime.utcnow()
+        change_reason="项目创建"
     )
-    db.add(status_log)
     
     db.commit()
     db.refresh(db_project)
     
     return success_response(
-        data=ProjectResponse.model_validate(db_project).model_dump(),
+        data=PROJECT_ADAPTER.dump_python(
+            PROJECT_ADAPTER.validate_python(db_project, from_attributes=True)
+        ),
         message=f"项目 {project_number} 创建成功"
     )
 
 # ✏️ 项目更新API
-@router.put("/{project_id}", response_model=ProjectResponse)
+@router.put("/{project_id}", response_model=None)
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
@@ -264,26 +274,27 @@ async def update_project(
     
     # 如果状态发生变更，记录日志
     if new_status and new_status != old_status:
-        status_log = ProjectStatusLog(
+        ProjectStatusLog.queue(
+            db,
             project_id=project_id,
             user_id=current_user.id,
             from_status=old_status,
             to_status=new_status,
-            change_reason="项目信息更新",
-            created_at=datetime.utcnow()
+            change_reason="项目信息更新"
         )
-        db.add(status_log)
     
     db.commit()
     db.refresh(project)
     
     return success_response(
-        data=ProjectResponse.model_validate(project).model_dump(),
+        data=PROJECT_ADAPTER.dump_python(
+            PROJECT_ADAPTER.validate_python(project, from_attributes=True)
+        ),
         message="项目信息更新成功"
     )
 
 # 🔄 项目状态更新API
-@router.patch("/{project_id}/status", response_model=ProjectResponse)
+@router.patch("/{project_id}/status", response_model=None)
 async def update_project_status(
     project_id: int,
     status_data: ProjectStatusUpdate,
@@ -330,22 +341,22 @@ async def update_project_status(
         project.completed_at = datetime.utcnow()
     
     # 记录状态变更日志
-    status_log = ProjectStatusLog(
+    ProjectStatusLog.queue(
+        db,
         project_id=project_id,
         user_id=current_user.id,
         from_status=old_status,
         to_status=status_data.status,
-        change_reason=status_data.change_reason,
-        notes=status_data.notes,
-        created_at=datetime.utcnow()
+        change_reason=status_data.change_reason
     )
-    db.add(status_log)
     
     db.commit()
     db.refresh(project)
     
     return success_response(
-        data=ProjectResponse.model_validate(project).model_dump(),
+        data=PROJECT_ADAPTER.dump_python(
+            PROJECT_ADAPTER.validate_python(project, from_attributes=True)
+        ),
         message=f"项目状态已从 {old_status} 更新为 {status_data.status}"
     )
 
@@ -384,16 +395,14 @@ async def delete_project(
     project.updated_at = datetime.utcnow()
     
     # 记录删除日志
-    status_log = ProjectStatusLog(
+    ProjectStatusLog.queue(
+        db,
         project_id=project_id,
         user_id=current_user.id,
         from_status=project.status,
         to_status=StatusEnum.ARCHIVED,
-        change_reason="项目删除",
-        notes="项目已被软删除",
-        created_at=datetime.utcnow()
+        change_reason="项目删除"
     )
-    db.add(status_log)
     
     db.commit()
     
@@ -425,10 +434,11 @@ async def get_project_statistics(
     
     # 财务统计
     revenue_stats = db.query(
-        func.sum(Project.final_price).label('total_revenue'),
+        func.sum(Project.final_amount).label('total_revenue'),
         func.sum(Project.cost_price).label('total_cost'),
-        func.avg(Project.final_price).label('avg_revenue')
-    ).filter(Project.final_price.isnot(None)).first()
+        # avg 不继承列类型，显式指定以按分换算为元
+        func.avg(Project.final_amount, type_=Money).label('avg_revenue')
+    ).filter(Project.final_amount.isnot(None)).first()
     
     # 本月新增项目
     from datetime import datetime, timedelta
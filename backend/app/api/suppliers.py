@@ -18,7 +18,7 @@ from app.schemas import (
 )
 from app.auth import get_current_active_user
 from app.permissions import Permission, check_permission
-from app.api import success_response, error_response, API_TAGS
+from app.api import success_response, error_response, model_json_response, API_TAGS
 from datetime import datetime
 
 router = APIRouter(prefix="/suppliers", tags=[API_TAGS["suppliers"]])
@@ -82,10 +82,7 @@ async def get_suppliers(
     ).offset(skip).limit(page_size).all()
     
     # 转换为响应格式
-    supplier_list = []
-    for supplier in suppliers:
-        supplier_data = SupplierResponse.model_validate(supplier)
-        supplier_list.append(supplier_data.model_dump())
+    supplier_list = [SupplierResponse.from_orm_trusted(supplier) for supplier in suppliers]
     
     # 分页元数据
     meta = PaginationMeta(
@@ -95,12 +92,12 @@ async def get_suppliers(
         total_pages=total_pages
     )
     
-    return PaginatedResponse(
+    return model_json_response(PaginatedResponse(
         success=True,
         message=f"获取供应商列表成功，共{total}个供应商",
         data=supplier_list,
         meta=meta
-    )
+    ))
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
 async def get_supplier(
@@ -125,7 +122,7 @@ async def get_supplier(
         )
     
     return success_response(
-        data=SupplierResponse.model_validate(supplier).model_dump(),
+        data=SupplierResponse.from_orm_trusted(supplier).model_dump(),
         message="获取供应商详情成功"
     )
 
@@ -177,7 +174,7 @@ async def create_supplier(
     db.refresh(db_supplier)
     
     return success_response(
-        data=SupplierResponse.model_validate(db_supplier).model_dump(),
+        data=SupplierResponse.from_orm_trusted(db_supplier).model_dump(),
         message=f"供应商 {supplier_data.name} 创建成功"
     )
 
@@ -228,7 +225,7 @@ async def update_supplier(
     db.refresh(supplier)
     
     return success_response(
-        data=SupplierResponse.model_validate(supplier).model_dump(),
+        data=SupplierResponse.from_orm_trusted(supplier).model_dump(),
         message="供应商信息更新成功"
     )
 
@@ -281,7 +278,7 @@ async def update_supplier_rating(
     db.refresh(supplier)
     
     return success_response(
-        data=SupplierResponse.model_validate(supplier).model_dump(),
+        data=SupplierResponse.from_orm_trusted(supplier).model_dump(),
         message=f"供应商评级已从 {old_rating} 更新为 {rating}"
     )
 
@@ -422,7 +419,7 @@ async def search_suppliers_by_service(
     # 转换为响应格式
     supplier_list = []
     for supplier in suppliers:
-        supplier_data = SupplierResponse.model_validate(supplier)
+        supplier_data = SupplierResponse.from_orm_trusted(supplier)
         supplier_list.append(supplier_data.model_dump())
     
     return success_response(
@@ -8,16 +8,17 @@ AI管理系统 - 任务管理API
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 
 from app.database import get_db
-from app.models import Task, Project, User, Supplier
+from app.models import Task, Project, User, Supplier, task_list_query
 from app.schemas import (
-    TaskCreate, TaskUpdate, TaskResponse, PaginatedResponse, PaginationMeta
+    TaskCreate, TaskUpdate, PaginatedResponse, PaginationMeta,
+    TASK_LIST_ADAPTER, TASK_ADAPTER
 )
 from app.auth import get_current_active_user
 from app.permissions import Permission, check_permission, check_project_access
-from app.api import success_response, error_response, API_TAGS
+from app.api import success_response, error_response, model_json_response, API_TAGS
 from datetime import datetime, date
 
 router = APIRouter(prefix="/tasks", tags=[API_TAGS["tasks"]])
@@ -38,8 +39,8 @@ async def get_tasks(
 ):
     """获取任务列表"""
     
-    # 构建查询
-    query = db.query(Task).join(Project)
+    # 构建查询 (关联对象随分页查询一并加载)
+    query = task_list_query().join(Task.project)
     
     # 权限过滤 - 只能看到有权限的项目的任务
     if not check_permission(current_user, Permission.TASK_READ):
@@ -89,18 +90,15 @@ async def get_tasks(
         query = query.filter(search_filter)
     
     # 获取总数
-    total = query.count()
+    total = db.scalar(select(func.count()).select_from(query.subquery()))
     total_pages = (total + page_size - 1) // page_size
     
     # 分页查询
     skip = (page - 1) * page_size
-    tasks = query.order_by(Task.created_at.desc()).offset(skip).limit(page_size).all()
+    tasks = db.scalars(query.order_by(Task.created_at.desc()).offset(skip).limit(page_size)).all()
     
     # 转换为响应格式
-    task_list = []
-    for task in tasks:
-        task_data = TaskResponse.model_validate(task)
-        task_list.append(task_data.model_dump())
+    task_list = TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)
     
     # 分页元数据
     meta = PaginationMeta(
@@ -110,14 +108,14 @@ async def get_tasks(
         total_pages=total_pages
     )
     
-    return PaginatedResponse(
+    return model_json_response(PaginatedResponse(
         success=True,
         message=f"获取任务列表成功，共{total}个任务",
         data=task_list,
         meta=meta
-    )
+    ))
 
-@router.get("/{task_id}", response_model=TaskResponse)
+@router.get("/{task_id}", response_model=None)
 async def get_task(
     task_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -138,12 +136,14 @@ async def get_task(
         check_project_access(current_user, project)
     
     return success_response(
-        data=TaskResponse.model_validate(task).model_dump(),
+        data=TASK_ADAPTER.dump_python(
+            TASK_ADAPTER.validate_python(task, from_attributes=True)
+        ),
         message="获取任务详情成功"
     )
 
 # 🆕 任务创建API
-@router.post("/", response_model=TaskResponse)
+@router.post("/", response_model=None)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_active_user),
@@ -208,12 +208,14 @@ async def create_task(
     db.refresh(db_task)
     
     return success_response(
-        data=TaskResponse.model_validate(db_task).model_dump(),
+        data=TASK_ADAPTER.dump_python(
+            TASK_ADAPTER.validate_python(db_task, from_attributes=True)
+        ),
         message="任务创建成功"
     )
 
 # ✏️ 任务更新API
-@router.put("/{task_id}", response_model=TaskResponse)
+@router.put("/{task_id}", response_model=None)
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
@@ -265,7 +267,9 @@ async def update_task(
     db.refresh(task)
     
     return success_response(
-        data=TaskResponse.model_validate(task).model_dump(),
+        data=TASK_ADAPTER.dump_python(
+            TASK_ADAPTER.validate_python(task, from_attributes=True)
+        ),
         message="任务信息更新成功"
     )
 
@@ -328,7 +332,9 @@ async def update_task_status(
     db.refresh(task)
     
     return success_response(
-        data=TaskResponse.model_validate(task).model_dump(),
+        data=TASK_ADAPTER.dump_python(
+            TASK_ADAPTER.validate_python(task, from_attributes=True)
+        ),
         message=f"任务状态已从 {old_status} 更新为 {status}"
     )
 
@@ -376,7 +382,9 @@ async def assign_task(
     db.refresh(task)
     
     return success_response(
-        data=TaskResponse.model_validate(task).model_dump(),
+        data=TASK_ADAPTER.dump_python(
+            TASK_ADAPTER.validate_python(task, from_attributes=True)
+        ),
         message=f"任务已分配给 {assignee.full_name or assignee.username}"
     )
 
@@ -435,7 +443,7 @@ async def get_my_tasks(
     """获取我的任务列表"""
     
     # 查询当前用户相关的任务
-    query = db.query(Task).filter(
+    query = task_list_query().filter(
         or_(
             Task.assignee_id == current_user.id,
             Task.creator_id == current_user.id
@@ -447,18 +455,15 @@ async def get_my_tasks(
         query = query.filter(Task.status == status)
     
     # 获取总数
-    total = query.count()
+    total = db.scalar(select(func.count()).select_from(query.subquery()))
     total_pages = (total + page_size - 1) // page_size
     
     # 分页查询
     skip = (page - 1) * page_size
-    tasks = query.order_by(Task.due_date.asc()).offset(skip).limit(page_size).all()
+    tasks = db.scalars(query.order_by(Task.due_date.asc()).offset(skip).limit(page_size)).all()
     
     # 转换为响应格式
-    task_list = []
-    for task in tasks:
-        task_data = TaskResponse.model_validate(task)
-        task_list.append(task_data.model_dump())
+    task_list = TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)
     
     # 分页元数据
     meta = PaginationMeta(
@@ -468,9 +473,9 @@ async def get_my_tasks(
         total_pages=total_pages
     )
     
-    return PaginatedResponse(
+    return model_json_response(PaginatedResponse(
         success=True,
         message=f"获取我的任务列表成功，共{total}个任务",
         data=task_list,
         meta=meta
-    )
\ No newline at end of file
+    ))
\ No newline at end of file
@@ -11,14 +11,13 @@ import jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import get_db, get_async_db
 from app.models import User
 from app.schemas import UserResponse, TokenResponse
-from app import RoleEnum
 
 settings = get_settings()
 
@@ -140,7 +139,7 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     """验证用户凭证"""
     try:
         # 支持用户名或邮箱登录
-        user = db.query(User).filter(
+        user = db.query(User).options(undefer(User.password_hash)).filter(
             (User.username == username) | (User.email == username)
         ).first()
         
@@ -172,7 +171,7 @@ async def authenticate_user_async(db: AsyncSession, username: str, password: str
     try:
         # 支持用户名或邮箱登录
         result = await db.execute(
-            select(User).where(
+            select(User).options(undefer(User.password_hash)).where(
                 (User.username == username) | (User.email == username)
             )
         )
@@ -312,7 +311,7 @@ def get_current_admin_user(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
     """获取当前管理员用户"""
-    if not current_user.is_admin and current_user.role != RoleEnum.ADMIN:
+    if not current_user.is_privileged:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -323,7 +322,7 @@ async def get_current_admin_user_async(
     current_user: User = Depends(get_current_active_user_async)
 ) -> User:
     """获取当前管理员用户 (异步版本)"""
-    if not current_user.is_admin and current_user.role != RoleEnum.ADMIN:
+    if not current_user.is_privileged:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -359,7 +358,7 @@ def login_user(db: Session, username: str, password: str) -> TokenResponse:
         refresh_token=refresh_token,
         token_type="bearer",
         expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        user=UserResponse.model_validate(user)
+        user=UserResponse.from_orm_trusted(user)
     )
 
 async def login_user_async(db: AsyncSession, username: str, password: str) -> TokenResponse:
@@ -390,7 +389,7 @@ async def login_user_async(db: AsyncSession, username: str, password: str) -> To
         refresh_token=refresh_token,
         token_type="bearer",
         expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        user=UserResponse.model_validate(user)
+        user=UserResponse.from_orm_trusted(user)
     )
 
 def refresh_access_token(db: Session, refresh_token: str) -> TokenResponse:
@@ -424,7 +423,7 @@ def refresh_access_token(db: Session, refresh_token: str) -> TokenResponse:
             refresh_token=refresh_token,  # 刷新令牌保持不变
             token_type="bearer",
             expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            user=UserResponse.model_validate(user)
+            user=UserResponse.from_orm_trusted(user)
         )
         
     except AuthenticationError as e:
@@ -6,11 +6,16 @@ AI管理系统 - 数据库连接管理
 """
 
 import os
-from typing import AsyncGenerator, Generator
-from sqlalchemy import create_engine, MetaData, text
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+import re
+import logging
+import threading
+from datetime import date
+from typing import Any, AsyncGenerator, Dict, Generator, Iterator, List, Optional
+from sqlalchemy import create_engine, event, MetaData, text, insert
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from contextlib import contextmanager
 import asyncio
 
@@ -31,10 +36,19 @@ ASYNC_DATABASE_URL = DATABASE_URL
 if settings.is_mysql:
     # MySQL异步驱动
     ASYNC_DATABASE_URL = DATABASE_URL.replace("mysql://", "mysql+aiomysql://")
+elif settings.is_postgresql:
+    # PostgreSQL异步驱动
+    ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 elif settings.is_sqlite:
     # SQLite异步驱动
     ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite:///", "sqlite+aiosqlite:///")
 
+# 📝 SQL日志 (替代 echo=settings.DEBUG，未启用时不格式化语句和参数)
+_sql_logger = logging.getLogger("sqlalchemy.engine")
+_sql_logger.setLevel(logging.INFO if settings.DEBUG else logging.WARNING)
+if settings.DEBUG and not _sql_logger.handlers:
+    _sql_logger.addHandler(logging.StreamHandler())
+
 # 📊 创建数据库引擎
 # 同步引擎 (用于初始化和迁移)
 engine = create_engine(
@@ -42,26 +56,63 @@ engine = create_engine(
     **settings.get_database_config()
 )
 
+# 健康检查引擎 (独立的1~2个连接，业务连接池耗尽时探测仍能拿到连接，不会误判为数据库故障)
+_health_engine_config = settings.get_database_config()
+if not settings.is_sqlite:
+    _health_engine_config.update({"pool_size": 1, "max_overflow": 1, "pool_timeout": 5})
+health_engine = create_engine(
+    DATABASE_URL,
+    **_health_engine_config
+)
+
 # 异步引擎 (用于API操作)
+_async_engine_config = settings.get_async_database_config()
+if not settings.is_sqlite:
+    # asyncio驱动必须使用AsyncAdaptedQueuePool，普通QueuePool会阻塞事件循环
+    _async_engine_config["poolclass"] = AsyncAdaptedQueuePool
+
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True
+    **_async_engine_config
 )
 
+# 🍴 多进程部署 (gunicorn -w N) fork后子进程不复用父进程的连接
+def _dispose_after_fork():
+    engine.dispose(close=False)
+    health_engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
 # 📝 会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# commit后不过期已加载属性 (写入后继续读取无需重新SELECT)，需要数据库生成的值时显式 refresh()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+HealthSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=health_engine)
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
+    autoflush=False,
     expire_on_commit=False
 )
 
 # 🏗️ 数据库基类
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """ORM模型基类 (SQLAlchemy 2.0 类型注解映射)"""
+    pass
+
 metadata = MetaData()
 
 # 🔄 数据库依赖注入
+def _is_disconnect(error: Exception) -> bool:
+    """
+    是否为连接断开 (如MySQL重启)
+    死锁(1213)、锁等待超时(1205)等同样是 OperationalError，但连接仍可用，不能据此重建连接池
+    """
+    return isinstance(error, DisconnectionError) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
 def get_db() -> Generator[Session, None, None]:
     """
     同步数据库会话依赖
@@ -70,8 +121,17 @@ def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
-    except Exception:
-        db.rollback()
+    except Exception as e:
+        if _is_disconnect(e):
+            # 连接已断开，丢弃当前连接并重建连接池
+            db.invalidate()
+            engine.dispose()
+        else:
+            try:
+                db.rollback()
+            except Exception:
+                # 回滚失败说明连接已不可用，直接关闭而不是归还连接池
+                db.invalidate()
         raise
     finally:
         db.close()
@@ -84,12 +144,66 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
-        except Exception:
-            await session.rollback()
+        except Exception as e:
+            if _is_disconnect(e):
+                # 连接已断开，丢弃当前连接并重建连接池
+                await session.invalidate()
+                await async_engine.dispose()
+            else:
+                try:
+                    await session.rollback()
+                except Exception:
+                    # 回滚失败说明连接已不可用，直接关闭而不是归还连接池
+                    await session.invalidate()
             raise
         finally:
             await session.close()
 
+def bulk_insert(db: Session, model: type, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+    """
+    批量插入 (不构造ORM对象)
+    使用 session.execute(insert(Model), [dict, ...])，由insertmanyvalues合并为多行INSERT
+    """
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start:start + batch_size])
+    return len(rows)
+
+def stream_query(db: Session, stmt, chunk_size: int = 1000) -> Iterator[Any]:
+    """
+    服务端游标流式读取 (用于导出/报表等无上限扫描)
+    每次只在内存中保留chunk_size行；小结果集的普通查询无需使用
+    """
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+@contextmanager
+def count_queries(bind=None) -> Iterator[List[str]]:
+    """
+    记录代码块内执行的SQL语句 (用于排查N+1查询)
+    监听整个引擎，并发请求的语句也会被计入，仅用于调试/脚本
+    
+        with count_queries() as statements:
+            client.get("/api/v1/projects/")
+        assert len(statements) <= 2    # 总数 + 分页查询 (见 tests/test_projects_api.py)
+    """
+    target = bind if bind is not None else engine
+    if isinstance(target, AsyncEngine):
+        target = target.sync_engine
+    statements: List[str] = []
+    
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", _before_cursor_execute)
+
 @contextmanager
 def get_db_context():
     """
@@ -106,6 +220,42 @@ def get_db_context():
     finally:
         db.close()
 
+@contextmanager
+def get_health_db_context():
+    """
+    健康检查数据库会话 (使用 health_engine 的独立连接池)
+    只读探测，不提交
+    """
+    db = HealthSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 🔥 连接池预热
+async def prewarm_pool(size: Optional[int] = None) -> int:
+    """
+    预先建立连接池中的连接 (在应用startup事件中调用)
+    避免首批请求各自承担TCP握手和认证的开销
+    """
+    if size is None:
+        pool_size = getattr(async_engine.pool, "size", None)
+        if not callable(pool_size):
+            # NullPool等不保留连接的连接池无需预热
+            return 0
+        size = pool_size()
+    
+    results = await asyncio.gather(
+        *(async_engine.connect() for _ in range(size)), return_exceptions=True
+    )
+    # 部分连接失败时也要归还已建立的连接，再抛出第一个错误
+    conns = [result for result in results if not isinstance(result, BaseException)]
+    await asyncio.gather(*(conn.close() for conn in conns), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+    return size
+
 # 🚀 数据库初始化函数
 def create_database():
     """
@@ -148,7 +298,7 @@ def create_tables():
         # 导入所有模型 (确保模型被注册)
         from app.models import (
             User, Project, Supplier, Task, ProjectFile, 
-            ProjectStatusLog, FinancialRecord, AIConversation, SystemConfig
+            ProjectStatusLog, FinancialRecord, AIConversation, AIConversationBody, SystemConfig
         )
         
         # 创建所有表
@@ -167,7 +317,7 @@ async def create_tables_async():
         # 导入所有模型
         from app.models import (
             User, Project, Supplier, Task, ProjectFile, 
-            ProjectStatusLog, FinancialRecord, AIConversation, SystemConfig
+            ProjectStatusLog, FinancialRecord, AIConversation, AIConversationBody, SystemConfig
         )
         
         async with async_engine.begin() as conn:
@@ -187,11 +337,100 @@ def drop_tables():
     else:
         print("❌ 生产环境禁止删除表操作")
 
+# 🗓️ AI对话表分区维护 (仅PostgreSQL)
+AI_CONVERSATION_PARTITION_PATTERN = re.compile(r"^ai_conversations_y(\d{4})m(\d{2})$")
+
+def _add_months(month: date, months: int) -> date:
+    """月份加减 (month为某月1日)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def create_ai_conversation_partition(conn, month: date):
+    """创建指定月份的AI对话分区 (已存在则跳过)"""
+    start = month.replace(day=1)
+    end = _add_months(start, 1)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS ai_conversations_y{start:%Y}m{start:%m} "
+        f"PARTITION OF ai_conversations FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+def maintain_ai_conversation_partitions(months_ahead: int = 1, retain_months: int = 12) -> dict:
+    """
+    预创建未来月份分区，分离超过保留期的旧分区
+    分离后的分区仍是独立表，可归档后再删除
+    """
+    if not settings.is_postgresql:
+        return {"skipped": "not postgresql"}
+    
+    with engine.begin() as conn:
+        partitioned = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'ai_conversations')"
+        )).scalar()
+        if not partitioned:
+            return {"skipped": "ai_conversations is not partitioned"}
+        
+        this_month = date.today().replace(day=1)
+        for offset in range(months_ahead + 1):
+            create_ai_conversation_partition(conn, _add_months(this_month, offset))
+        
+        cutoff = _add_months(this_month, -retain_months)
+        partitions = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'ai_conversations'"
+        )).scalars().all()
+        
+        detached = []
+        for name in partitions:
+            match = AI_CONVERSATION_PARTITION_PATTERN.match(name)
+            if match and date(int(match.group(1)), int(match.group(2)), 1) < cutoff:
+                conn.execute(text(f"ALTER TABLE ai_conversations DETACH PARTITION {name}"))
+                # 正文侧表未分区，删除已分离分区对应的正文
+                conn.execute(text(
+                    f"DELETE FROM ai_conversations_body b USING {name} p WHERE b.id = p.id"
+                ))
+                detached.append(name)
+    
+    return {"created_until": str(_add_months(this_month, months_ahead)), "detached": detached}
+
+# 📊 项目看板物化视图刷新 (仅PostgreSQL，其他数据库为普通视图无需刷新)
+DASHBOARD_REFRESH_DELAY = 5.0
+_dashboard_refresh_timer: Optional[threading.Timer] = None
+_dashboard_refresh_lock = threading.Lock()
+
+def refresh_project_dashboard():
+    """并发刷新看板物化视图 (依赖 id 唯一索引，刷新期间不阻塞读取)"""
+    global _dashboard_refresh_timer
+    with _dashboard_refresh_lock:
+        _dashboard_refresh_timer = None
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY project_dashboard_mv"))
+    except Exception as e:
+        print(f"❌ 项目看板刷新失败: {e}")
+
+def schedule_dashboard_refresh(delay: float = DASHBOARD_REFRESH_DELAY):
+    """
+    延迟刷新看板 (防抖)
+    delay 秒内的多次状态变更只触发一次刷新
+    """
+    global _dashboard_refresh_timer
+    if not settings.is_postgresql:
+        return
+    with _dashboard_refresh_lock:
+        if _dashboard_refresh_timer is not None:
+            return
+        _dashboard_refresh_timer = threading.Timer(delay, refresh_project_dashboard)
+        _dashboard_refresh_timer.daemon = True
+        _dashboard_refresh_timer.start()
+
 # 🔍 数据库连接测试
-def test_connection() -> bool:
-    """测试数据库连接"""
+def test_connection(bind=None) -> bool:
+    """测试数据库连接 (bind 默认为业务引擎 engine)"""
     try:
-        with engine.connect() as conn:
+        with (bind if bind is not None else engine).connect() as conn:
             if settings.is_sqlite:
                 result = conn.execute(text("SELECT 1"))
             else:
@@ -228,10 +467,10 @@ async def test_async_connection() -> bool:
         return False
 
 # 📈 数据库状态监控
-def get_db_status() -> dict:
-    """获取数据库状态信息"""
+def get_db_status(bind=None) -> dict:
+    """获取数据库状态信息 (bind 默认为业务引擎 engine)"""
     try:
-        with engine.connect() as conn:
+        with (bind if bind is not None else engine).connect() as conn:
             if settings.is_mysql:
                 # MySQL状态查询
                 try:
@@ -2,263 +2,826 @@
 # -*- coding: utf-8 -*-
 """
 AI管理系统 - 数据库模型定义
-使用SQLAlchemy ORM定义所有数据表结构
+使用SQLAlchemy 2.0 ORM (Mapped类型注解) 定义所有数据表结构
 """
 
-from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, Date, ForeignKey, Index, Enum as SQLEnum
-from sqlalchemy.orm import relationship, backref
-from sqlalchemy.ext.declarative import declarative_base
+import io
+import select as _select
+import threading
+import time
+from datetime import datetime, date
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Integer, BigInteger, String, Text, Float, Boolean, DateTime, Date, ForeignKey, Index, Table, Column, Select, select, insert, Enum as SQLEnum
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy import event, func, text, cast, type_coerce, and_, or_, JSON, DDL, FetchedValue
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, joinedload, selectinload, raiseload
 
-from app import StatusEnum, RoleEnum
+from app import StatusEnum, RoleEnum, TaskStatusEnum, PriorityEnum, FileTypeEnum, FinancialTypeEnum, ConfigKeyEnum
+from app.database import Base, engine, metadata, settings, bulk_insert, schedule_dashboard_refresh
 
-Base = declarative_base()
+# ⏱️ 数据库端UTC时间 (created_at等由数据库生成，批量插入/COPY无需Python端默认值)
+class utcnow(FunctionElement):
+    """当前UTC时间 (各数据库方言分别编译)"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite的CURRENT_TIMESTAMP即为UTC
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+@compiles(utcnow, "mysql")
+def _utcnow_mysql(element, compiler, **kw):
+    return "(UTC_TIMESTAMP())"
+
+# 💰 金额: 数据库按"分"存储为8字节整数 (无浮点误差，比较为整数运算)，Python端仍为"元"
+class Money(TypeDecorator):
+    """金额类型 (BIGINT分 <-> float元)"""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(round(value * 100))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value / 100
+
+def native_enum(enum_class: type, name: str) -> SQLEnum:
+    """
+    数据库原生枚举 (按枚举值存储)
+    PostgreSQL为4字节ENUM类型，MySQL为ENUM，SQLite退化为VARCHAR
+    """
+    return SQLEnum(
+        enum_class, name=name, native_enum=True,
+        values_callable=lambda members: [member.value for member in members]
+    )
+
+ROLE_ENUM = native_enum(RoleEnum, 'user_role')
+PROJECT_STATUS_ENUM = native_enum(StatusEnum, 'project_status')
+TASK_STATUS_ENUM = native_enum(TaskStatusEnum, 'task_status')
+PRIORITY_ENUM = native_enum(PriorityEnum, 'priority_level')
+FILE_TYPE_ENUM = native_enum(FileTypeEnum, 'file_type')
+FINANCIAL_TYPE_ENUM = native_enum(FinancialTypeEnum, 'financial_record_type')
+
+# 🔥 热点状态 (部分索引只覆盖这些行，体积远小于全列索引)
+ACTIVE_PROJECT_STATUSES = (StatusEnum.IN_DESIGN, StatusEnum.PENDING_CONFIRM, StatusEnum.IN_PRODUCTION)
+OPEN_TASK_STATUSES = (TaskStatusEnum.PENDING, TaskStatusEnum.IN_PROGRESS)
+PARTIAL_INDEX_DIALECTS = ("postgresql", "sqlite")  # MySQL不支持部分索引，不创建
+
+# 🏷️ 标签列: PostgreSQL为JSONB (GIN索引支持 @> 包含查询)，其他数据库为JSON
+TAGS_TYPE = JSON().with_variant(JSONB(), "postgresql")
+
+def _tags_gin_index(name: str) -> Index:
+    """标签GIN索引 (jsonb_path_ops 体积约为默认操作符类的一半，仅支持 @>)"""
+    return Index(name, 'tags', postgresql_using='gin',
+                 postgresql_ops={'tags': 'jsonb_path_ops'}).ddl_if(dialect="postgresql")
+
+# ⏳ 只追加表的时间列: 物理顺序与插入时间一致，BRIN索引只记录每段数据页的最小/最大值
+def _brin_index(name: str, column: str) -> Index:
+    """时间列BRIN索引 (仅PostgreSQL；其他数据库范围查询依赖已有的组合索引)"""
+    return Index(name, column, postgresql_using='brin',
+                 postgresql_with={'pages_per_range': 32}).ddl_if(dialect="postgresql")
+
+class TaggedMixin:
+    """带标签的模型 (需定义 tags 列)"""
+
+    @classmethod
+    def tags_contains(cls, *labels: str) -> Any:
+        """标签包含全部 labels 的过滤条件 (PostgreSQL生成 tags @> :labels，命中GIN索引)"""
+        if settings.is_postgresql:
+            return type_coerce(cls.tags, JSONB).contains(list(labels))
+        # 其他数据库没有JSON包含索引，按序列化文本匹配
+        return and_(*[cast(cls.tags, String).like(f'%"{label}"%') for label in labels])
+
+def _status_in(statuses) -> Any:
+    """部分索引条件 status IN (...)"""
+    return text("status IN (%s)" % ", ".join(f"'{status.value}'" for status in statuses))
 
 class User(Base):
     """用户模型"""
     __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
-    email = Column(String(100), unique=True, index=True)
-    full_name = Column(String(100))
-    password_hash = Column(String(255), nullable=False)
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
+    email: Mapped[Optional[str]] = mapped_column(String(100), unique=True, index=True)
+    full_name: Mapped[Optional[str]] = mapped_column(String(100))
+    # 仅登录/改密时需要，默认不随用户加载 (认证路径使用 undefer(User.password_hash))
+    password_hash: Mapped[str] = mapped_column(String(255), nullable=False, deferred=True, deferred_group='credentials')
+
     # 角色和权限
-    role = Column(SQLEnum(RoleEnum), default=RoleEnum.VIEWER, nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-    
+    role: Mapped[RoleEnum] = mapped_column(ROLE_ENUM, default=RoleEnum.VIEWER, nullable=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_admin: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+
     # 企业微信
-    wechat_userid = Column(String(100), unique=True, index=True)
-    wechat_name = Column(String(100))
-    
+    wechat_userid: Mapped[Optional[str]] = mapped_column(String(100), unique=True, index=True)
+    wechat_name: Mapped[Optional[str]] = mapped_column(String(100))
+
     # 时间戳
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_login = Column(DateTime)
-    
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
     # 关系
-    created_projects = relationship("Project", back_populates="creator", foreign_keys="Project.creator_id")
-    designed_projects = relationship("Project", back_populates="designer", foreign_keys="Project.designer_id")
-    sales_projects = relationship("Project", back_populates="sales", foreign_keys="Project.sales_id")
-    assigned_tasks = relationship("Task", back_populates="assignee", foreign_keys="Task.assignee_id")
-    created_tasks = relationship("Task", back_populates="creator", foreign_keys="Task.creator_id")
-    ai_conversations = relationship("AIConversation", back_populates="user")
-    
+    created_projects: Mapped[List["Project"]] = relationship(back_populates="creator", foreign_keys="Project.creator_id")
+    designed_projects: Mapped[List["Project"]] = relationship(back_populates="designer", foreign_keys="Project.designer_id")
+    sales_projects: Mapped[List["Project"]] = relationship(back_populates="sales", foreign_keys="Project.sales_id")
+    assigned_tasks: Mapped[List["Task"]] = relationship(back_populates="assignee", foreign_keys="Task.assignee_id")
+    created_tasks: Mapped[List["Task"]] = relationship(back_populates="creator", foreign_keys="Task.creator_id")
+    ai_conversations: Mapped[List["AIConversation"]] = relationship(back_populates="user")
+
+    @property
+    def is_privileged(self) -> bool:
+        """是否具有管理员权限 (超级管理员标记或管理员角色)"""
+        return bool(self.is_admin or self.role == RoleEnum.ADMIN)
+
     def __repr__(self):
         return f"<User {self.username}>"
 
-class Project(Base):
+PROJECT_SEARCH_COLUMNS = ('project_name', 'customer_name', 'project_number')
+
+class Project(TaggedMixin, Base):
     """项目模型"""
     __tablename__ = "projects"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    project_number = Column(String(50), unique=True, index=True)  # PRJ20240101001
-    project_name = Column(String(200), nullable=False)
-    customer_name = Column(String(100), nullable=False, index=True)
-    customer_phone = Column(String(50))
-    customer_email = Column(String(100))
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    project_number: Mapped[Optional[str]] = mapped_column(String(50), unique=True, index=True)  # PRJ20240101001
+    project_name: Mapped[str] = mapped_column(String(200), nullable=False)
+    customer_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    customer_phone: Mapped[Optional[str]] = mapped_column(String(50))
+    customer_email: Mapped[Optional[str]] = mapped_column(String(100))
+
     # 项目类型和状态
-    project_type = Column(String(50))
-    status = Column(String(50), default=StatusEnum.PENDING_QUOTE, index=True)
-    priority = Column(String(20), default="normal")  # low, normal, high, urgent
-    
+    project_type: Mapped[Optional[str]] = mapped_column(String(50))
+    status: Mapped[Optional[StatusEnum]] = mapped_column(PROJECT_STATUS_ENUM, default=StatusEnum.PENDING_QUOTE, index=True)
+    priority: Mapped[Optional[PriorityEnum]] = mapped_column(PRIORITY_ENUM, default=PriorityEnum.NORMAL)
+
     # 金额
-    quoted_price = Column(Float, default=0)
-    cost_price = Column(Float, default=0)
-    deposit_amount = Column(Float, default=0)
-    final_amount = Column(Float, default=0)
-    
+    quoted_price: Mapped[Optional[float]] = mapped_column(Money, default=0)
+    cost_price: Mapped[Optional[float]] = mapped_column(Money, default=0)
+    deposit_amount: Mapped[Optional[float]] = mapped_column(Money, default=0)
+    final_amount: Mapped[Optional[float]] = mapped_column(Money, default=0)
+
     # 支付状态
-    deposit_paid = Column(Boolean, default=False)
-    final_paid = Column(Boolean, default=False)
-    
+    deposit_paid: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    final_paid: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+
     # 时间相关
-    deadline = Column(Date)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    completed_at = Column(DateTime)
-    
-    # 项目描述和需求
-    requirements = Column(Text)
-    notes = Column(Text)
-    
+    deadline: Mapped[Optional[date]] = mapped_column(Date)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())  # 由 trg_*_touch 触发器维护
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    # 项目描述和需求 (大文本，列表不加载，详情使用 undefer_group('project_text'))
+    requirements: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group='project_text')
+    notes: Mapped[Optional[str]] = mapped_column(Text, deferred=True, deferred_group='project_text')
+    tags: Mapped[Optional[List[str]]] = mapped_column(TAGS_TYPE, default=list)
+
     # 外键关系
-    creator_id = Column(Integer, ForeignKey("users.id"))
-    designer_id = Column(Integer, ForeignKey("users.id"))
-    sales_id = Column(Integer, ForeignKey("users.id"))
-    
+    creator_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    designer_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    sales_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+
     # 关系
-    creator = relationship("User", back_populates="created_projects", foreign_keys=[creator_id])
-    designer = relationship("User", back_populates="designed_projects", foreign_keys=[designer_id])
-    sales = relationship("User", back_populates="sales_projects", foreign_keys=[sales_id])
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
-    status_logs = relationship("ProjectStatusLog", back_populates="project", cascade="all, delete-orphan")
-    files = relationship("ProjectFile", back_populates="project", cascade="all, delete-orphan")
-    financial_records = relationship("FinancialRecord", back_populates="project", cascade="all, delete-orphan")
-    
+    creator: Mapped[Optional["User"]] = relationship(back_populates="created_projects", foreign_keys=[creator_id])
+    designer: Mapped[Optional["User"]] = relationship(back_populates="designed_projects", foreign_keys=[designer_id])
+    sales: Mapped[Optional["User"]] = relationship(back_populates="sales_projects", foreign_keys=[sales_id])
+    # 一对多集合禁止隐式懒加载 (避免列表接口N+1)，需通过 selectinload 显式加载
+    tasks: Mapped[List["Task"]] = relationship(back_populates="project", cascade="all, delete-orphan", lazy="raise_on_sql")
+    status_logs: Mapped[List["ProjectStatusLog"]] = relationship(back_populates="project", cascade="all, delete-orphan", lazy="raise_on_sql")
+    files: Mapped[List["ProjectFile"]] = relationship(back_populates="project", cascade="all, delete-orphan", lazy="raise_on_sql")
+    financial_records: Mapped[List["FinancialRecord"]] = relationship(back_populates="project", cascade="all, delete-orphan")
+
     # 索引
     __table_args__ = (
         Index('ix_project_status_customer', 'status', 'customer_name'),
         Index('ix_project_designer_status', 'designer_id', 'status'),
+        Index('ix_project_creator_status', 'creator_id', 'status'),
+        # PostgreSQL下INCLUDE项目名称，列表查询可走index-only scan
+        Index('ix_project_status_deadline', 'status', 'deadline', postgresql_include=['project_name']),
+        # 部分索引：进行中项目、待收款项目
+        Index('ix_project_active_designer', 'designer_id', 'deadline',
+              postgresql_where=_status_in(ACTIVE_PROJECT_STATUSES),
+              sqlite_where=_status_in(ACTIVE_PROJECT_STATUSES)).ddl_if(dialect=PARTIAL_INDEX_DIALECTS),
+        Index('ix_project_payment_due', 'status',
+              postgresql_where=text('deposit_paid = false OR final_paid = false'),
+              sqlite_where=text('deposit_paid = 0 OR final_paid = 0')).ddl_if(dialect=PARTIAL_INDEX_DIALECTS),
+        _tags_gin_index('ix_project_tags_gin'),
+        # 搜索用三元组GIN索引 (PostgreSQL pg_trgm)，ILIKE '%关键词%' 不再全表扫描
+        *[Index(f'ix_project_{column}_trgm', column, postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}).ddl_if(dialect="postgresql")
+          for column in PROJECT_SEARCH_COLUMNS],
     )
-    
+
+    @classmethod
+    def search_condition(cls, keyword: str) -> Any:
+        """项目名称/客户名称/项目编号模糊搜索条件 (PostgreSQL命中三元组索引)"""
+        pattern = f"%{keyword}%"
+        return or_(*[getattr(cls, column).ilike(pattern) for column in PROJECT_SEARCH_COLUMNS])
+
     def __repr__(self):
         return f"<Project {self.project_number}: {self.project_name}>"
 
 class Task(Base):
     """任务模型"""
     __tablename__ = "tasks"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), nullable=False)
-    description = Column(Text)
-    task_type = Column(String(50))  # design, review, production, delivery
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    task_type: Mapped[Optional[str]] = mapped_column(String(50))  # design, review, production, delivery
+
     # 状态和优先级
-    status = Column(String(50), default="pending", index=True)
-    priority = Column(String(20), default="normal")
-    
+    status: Mapped[Optional[TaskStatusEnum]] = mapped_column(TASK_STATUS_ENUM, default=TaskStatusEnum.PENDING, index=True)
+    priority: Mapped[Optional[PriorityEnum]] = mapped_column(PRIORITY_ENUM, default=PriorityEnum.NORMAL)
+
     # 时间相关
-    due_date = Column(Date)
-    estimated_hours = Column(Float)
-    actual_hours = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    completed_at = Column(DateTime)
-    
+    due_date: Mapped[Optional[date]] = mapped_column(Date)
+    estimated_hours: Mapped[Optional[float]] = mapped_column(Float)
+    actual_hours: Mapped[Optional[float]] = mapped_column(Float)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())  # 由 trg_*_touch 触发器维护
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
     # 外键
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    assignee_id = Column(Integer, ForeignKey("users.id"))
-    creator_id = Column(Integer, ForeignKey("users.id"))
-    
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id"), nullable=False)
+    assignee_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    creator_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+
     # 关系
-    project = relationship("Project", back_populates="tasks")
-    assignee = relationship("User", back_populates="assigned_tasks", foreign_keys=[assignee_id])
-    creator = relationship("User", back_populates="created_tasks", foreign_keys=[creator_id])
-    
+    project: Mapped["Project"] = relationship(back_populates="tasks")
+    assignee: Mapped[Optional["User"]] = relationship(back_populates="assigned_tasks", foreign_keys=[assignee_id])
+    creator: Mapped[Optional["User"]] = relationship(back_populates="created_tasks", foreign_keys=[creator_id])
+
+    # 索引
+    __table_args__ = (
+        Index('ix_task_project_status', 'project_id', 'status'),
+        Index('ix_task_assignee_status_due', 'assignee_id', 'status', 'due_date'),
+        # 部分索引：未完成任务
+        Index('ix_task_open_assignee', 'assignee_id', 'due_date',
+              postgresql_where=_status_in(OPEN_TASK_STATUSES),
+              sqlite_where=_status_in(OPEN_TASK_STATUSES)).ddl_if(dialect=PARTIAL_INDEX_DIALECTS),
+    )
+
     def __repr__(self):
         return f"<Task {self.title}>"
 
 class Supplier(Base):
     """供应商模型"""
     __tablename__ = "suppliers"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, nullable=False)
-    company_name = Column(String(200))
-    service_type = Column(String(100), index=True)  # 印刷, 制作, 安装等
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    company_name: Mapped[Optional[str]] = mapped_column(String(200))
+    service_type: Mapped[Optional[str]] = mapped_column(String(100), index=True)  # 印刷, 制作, 安装等
+
     # 联系信息
-    contact_person = Column(String(50))
-    phone = Column(String(50))
-    email = Column(String(100))
-    address = Column(Text)
-    
+    contact_person: Mapped[Optional[str]] = mapped_column(String(50))
+    phone: Mapped[Optional[str]] = mapped_column(String(50))
+    email: Mapped[Optional[str]] = mapped_column(String(100))
+    address: Mapped[Optional[str]] = mapped_column(Text)
+
     # 评级和优选
-    rating = Column(Integer, default=5)  # 1-10分
-    is_preferred = Column(Boolean, default=False)
-    
+    rating: Mapped[Optional[int]] = mapped_column(Integer, default=5)  # 1-10分
+    is_preferred: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+
     # 备注
-    notes = Column(Text)
-    
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+
     # 时间戳
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
+
     # 关系
-    tasks = relationship("Task", secondary="task_suppliers", backref="suppliers")
-    
+    tasks: Mapped[List["Task"]] = relationship(secondary="task_suppliers", backref="suppliers")
+
     def __repr__(self):
         return f"<Supplier {self.name}>"
 
 class ProjectStatusLog(Base):
     """项目状态变更日志"""
     __tablename__ = "project_status_logs"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    
-    from_status = Column(String(50))
-    to_status = Column(String(50))
-    change_reason = Column(Text)
-    
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+
+    from_status: Mapped[Optional[str]] = mapped_column(String(50))
+    to_status: Mapped[Optional[str]] = mapped_column(String(50))
+    change_reason: Mapped[Optional[str]] = mapped_column(Text)
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+
     # 关系
-    project = relationship("Project", back_populates="status_logs")
-    user = relationship("User")
-    
+    project: Mapped["Project"] = relationship(back_populates="status_logs")
+    user: Mapped[Optional["User"]] = relationship()
+
     __table_args__ = (
         Index('ix_status_log_project_created', 'project_id', 'created_at'),
+        _brin_index('ix_status_log_created_brin', 'created_at'),
     )
 
-class ProjectFile(Base):
+    @classmethod
+    def bulk_log(cls, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """批量写入状态日志 (传入dict，不构造ORM对象，不触发relationship级联)"""
+        if rows:
+            db.info["dashboard_dirty"] = True
+        return bulk_copy(db, cls, rows)
+
+    @classmethod
+    def queue(cls, db: Session, **row: Any):
+        """
+        登记一条状态日志，提交事务前与本次请求的其他日志合并为一条 INSERT ... RETURNING
+        (代替逐条 add/flush/refresh)
+        """
+        db.info.setdefault("pending_status_logs", []).append(row)
+
+    @classmethod
+    def flush_queued(cls, db: Session) -> List[int]:
+        """立即写入已登记的状态日志，返回新日志ID (数据库不支持批量RETURNING时返回空列表)"""
+        rows = db.info.pop("pending_status_logs", None)
+        if not rows:
+            return []
+        db.info["dashboard_dirty"] = True
+        if db.get_bind().dialect.insert_executemany_returning:
+            return list(db.scalars(insert(cls).returning(cls.id), rows))
+        db.execute(insert(cls), rows)
+        return []
+
+class ProjectFile(TaggedMixin, Base):
     """项目文件"""
     __tablename__ = "project_files"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    
-    filename = Column(String(255), nullable=False)
-    file_path = Column(String(500))
-    file_size = Column(Integer)
-    file_type = Column(String(50))
-    
-    uploaded_by = Column(Integer, ForeignKey("users.id"))
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id"), nullable=False)
+
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_path: Mapped[Optional[str]] = mapped_column(String(500))
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger)  # 字节 (Integer超过2GB溢出)
+    file_type: Mapped[Optional[FileTypeEnum]] = mapped_column(FILE_TYPE_ENUM)
+    tags: Mapped[Optional[List[str]]] = mapped_column(TAGS_TYPE, default=list)
+
+    uploaded_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    uploaded_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+
     # 关系
-    project = relationship("Project", back_populates="files")
-    uploader = relationship("User")
+    project: Mapped["Project"] = relationship(back_populates="files")
+    uploader: Mapped[Optional["User"]] = relationship()
+
+    __table_args__ = (
+        Index('ix_project_file_project_type', 'project_id', 'file_type'),
+        _tags_gin_index('ix_project_file_tags_gin'),
+        _brin_index('ix_project_file_uploaded_brin', 'uploaded_at'),
+    )
+
+CONVERSATION_PREVIEW_LENGTH = 120
 
 class AIConversation(Base):
     """AI对话记录"""
     __tablename__ = "ai_conversations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    wechat_userid = Column(String(100), index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    
-    message_type = Column(String(50))  # text, image, voice
-    user_message = Column(Text)
-    ai_response = Column(Text)
-    
-    context_data = Column(Text)  # JSON存储上下文
-    processing_time = Column(Float)  # 处理耗时(秒)
-    
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    wechat_userid: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+
+    message_type: Mapped[Optional[str]] = mapped_column(String(50))  # text, image, voice
+
+    # 用户消息前120字 (写入时截取)，列表预览只读索引不回表；完整正文见 AIConversationBody
+    preview: Mapped[Optional[str]] = mapped_column(String(CONVERSATION_PREVIEW_LENGTH))
+
+    context_data: Mapped[Optional[str]] = mapped_column(Text)  # JSON存储上下文
+    processing_time: Mapped[Optional[float]] = mapped_column(Float)  # 处理耗时(秒)
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+
     # 关系
-    user = relationship("User", back_populates="ai_conversations")
+    user: Mapped[Optional["User"]] = relationship(back_populates="ai_conversations")
+    # 正文按需加载 (统计查询不应触碰正文表，展示时使用 joinedload(AIConversation.body))
+    body: Mapped[Optional["AIConversationBody"]] = relationship(
+        primaryjoin="AIConversation.id == foreign(AIConversationBody.id)",
+        uselist=False, lazy="raise", cascade="all, delete-orphan"
+    )
+
+    # 索引 (PostgreSQL下按月分区，见 migrations/002_ai_conversation_partitions.py)
+    __table_args__ = (
+        # PostgreSQL下INCLUDE预览字段，"最近N条对话"查询为index-only scan
+        Index('ix_ai_conversation_user_created', 'wechat_userid', 'created_at',
+              postgresql_include=['message_type', 'processing_time', 'preview']),
+        # 只追加、按时间顺序写入，BRIN索引体积远小于btree (其他数据库为普通索引)
+        Index('ix_ai_conversation_created_brin', 'created_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+    )
+
+    @classmethod
+    def bulk_log(cls, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        批量写入对话记录 (传入dict，不构造ORM对象，不触发relationship级联)
+        user_message / ai_response 拆分写入正文表，主表只保留预览
+        """
+        if not rows:
+            return 0
+        
+        headers, bodies = [], []
+        for row in rows:
+            header = dict(row)
+            body = {
+                "user_message": header.pop("user_message", None),
+                "ai_response": header.pop("ai_response", None),
+            }
+            if body["user_message"] and "preview" not in header:
+                header["preview"] = body["user_message"][:CONVERSATION_PREVIEW_LENGTH]
+            headers.append(header)
+            bodies.append(body)
+        
+        # 正文表与主表共享主键，需要先拿到主表生成的id
+        if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            ids = db.scalars(
+                insert(cls).returning(cls.id, sort_by_parameter_order=True), headers
+            ).all()
+        else:
+            ids = [
+                db.execute(insert(cls).values(**header)).inserted_primary_key[0]
+                for header in headers
+            ]
+        
+        return bulk_copy(db, AIConversationBody, [
+            dict(body, id=conversation_id) for conversation_id, body in zip(ids, bodies)
+        ])
+
+    @classmethod
+    def recent_previews_query(cls, wechat_userid: str, limit: int = 20) -> Select:
+        """用户最近的对话预览 (只查询覆盖索引中的列)"""
+        return select(
+            cls.wechat_userid, cls.created_at, cls.message_type, cls.processing_time, cls.preview
+        ).where(cls.wechat_userid == wechat_userid).order_by(cls.created_at.desc()).limit(limit)
+
+    @classmethod
+    def history_query(cls, wechat_userid: str, limit: int = 20) -> Select:
+        """用户最近的完整对话 (含正文，用于聊天记录展示)"""
+        return select(cls).options(joinedload(cls.body)).where(
+            cls.wechat_userid == wechat_userid
+        ).order_by(cls.created_at.desc()).limit(limit)
+
+class AIConversationBody(Base):
+    """AI对话正文 (与 AIConversation 共享主键的1:1侧表)"""
+    __tablename__ = "ai_conversations_body"
+
+    # 不声明外键: PostgreSQL下 ai_conversations 为分区表，主键为 (id, created_at)，id 单列无法被引用
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_message: Mapped[Optional[str]] = mapped_column(Text)
+    ai_response: Mapped[Optional[str]] = mapped_column(Text)
 
 class FinancialRecord(Base):
     """财务记录"""
     __tablename__ = "financial_records"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
-    
-    record_type = Column(String(50))  # income, expense
-    category = Column(String(50))  # deposit, final_payment, supplier_cost
-    amount = Column(Float, nullable=False)
-    
-    description = Column(Text)
-    payment_date = Column(Date)
-    
-    created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    project_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("projects.id"))
+
+    record_type: Mapped[Optional[FinancialTypeEnum]] = mapped_column(FINANCIAL_TYPE_ENUM)
+    category: Mapped[Optional[str]] = mapped_column(String(50))  # deposit, final_payment, supplier_cost
+    amount: Mapped[float] = mapped_column(Money, nullable=False)
+
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    payment_date: Mapped[Optional[date]] = mapped_column(Date)
+
+    created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+
     # 关系
-    project = relationship("Project", back_populates="financial_records")
-    creator = relationship("User")
+    project: Mapped[Optional["Project"]] = relationship(back_populates="financial_records")
+    creator: Mapped[Optional["User"]] = relationship()
+
+    __table_args__ = (
+        Index('ix_financial_project_type_date', 'project_id', 'record_type', 'payment_date'),
+        # payment_date 为业务录入日期，与插入顺序无关，BRIN建在 created_at 上
+        _brin_index('ix_financial_created_brin', 'created_at'),
+    )
+
+class SystemConfig(Base):
+    """系统配置 (读取走 system_config_cache，修改使用 SystemConfig.set_value)"""
+    __tablename__ = "system_configs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    config_key: Mapped[str] = mapped_column(String(100), unique=True, index=True, nullable=False)
+    config_value: Mapped[Optional[str]] = mapped_column(Text)
+    config_type: Mapped[Optional[str]] = mapped_column(String(20), default="string")  # string, boolean, integer, json
+    description: Mapped[Optional[str]] = mapped_column(String(255))
+    category: Mapped[Optional[str]] = mapped_column(String(50), index=True)  # basic, project, financial, ai
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
+
+    @classmethod
+    def set_value(cls, db: Session, key: str, value: str, **fields: Any) -> "SystemConfig":
+        """新增或修改配置，并递增配置版本号 (提交后各进程缓存失效)"""
+        config = db.query(cls).filter(cls.config_key == key).first()
+        if config is None:
+            config = cls(config_key=key)
+            db.add(config)
+        config.config_value = value
+        for name, field_value in fields.items():
+            setattr(config, name, field_value)
+        SystemConfigVersion.bump(db)
+        return config
+
+    def __repr__(self):
+        return f"<SystemConfig {self.config_key}>"
+
+class SystemConfigVersion(Base):
+    """系统配置版本号 (单行，任何配置变更时递增)"""
+    __tablename__ = "system_config_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, db: Session):
+        """递增版本号；PostgreSQL下同时 NOTIFY 监听中的进程"""
+        updated = db.execute(text(
+            "UPDATE system_config_version SET version = version + 1 WHERE id = 1"
+        )).rowcount
+        if not updated:
+            db.add(cls(id=1, version=1))
+        if settings.is_postgresql:
+            db.execute(text("SELECT pg_notify('system_config', '')"))
+        db.info["system_config_dirty"] = True
+
+class ProjectDashboard(Base):
+    """
+    项目看板汇总 (只读)
+    PostgreSQL下为物化视图，其他数据库为普通视图，见 migrations/003_project_dashboard_view.py
+    使用独立的 metadata，create_all 不会把它建成表
+    """
+    __table__ = Table('project_dashboard_mv', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('status', String(50)),
+        Column('designer_id', Integer),
+        Column('income', Float),
+        Column('expense', Float),
+        Column('open_tasks', Integer),
+    )
+
+    id: Mapped[int]
+    status: Mapped[Optional[str]]
+    designer_id: Mapped[Optional[int]]
+    income: Mapped[float]
+    expense: Mapped[float]
+    open_tasks: Mapped[int]
+
+    def __repr__(self):
+        return f"<ProjectDashboard {self.id}: {self.status}>"
+
+# 状态变更日志提交后刷新看板 (合并短时间内的多次变更)
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_dirty(session, flush_context):
+    if any(isinstance(obj, ProjectStatusLog) for obj in session.new):
+        session.info["dashboard_dirty"] = True
+
+@event.listens_for(Session, "before_commit")
+def _flush_queued_status_logs(session):
+    if session.info.get("pending_status_logs"):
+        # 先写入项目等待刷新的变更，保证外键可用
+        session.flush()
+        ProjectStatusLog.flush_queued(session)
+
+@event.listens_for(Session, "after_commit")
+def _refresh_dashboard_after_commit(session):
+    if session.info.pop("dashboard_dirty", False):
+        schedule_dashboard_refresh()
+    if session.info.pop("system_config_dirty", False):
+        system_config_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dashboard_dirty(session):
+    session.info.pop("dashboard_dirty", None)
+    session.info.pop("system_config_dirty", None)
+    session.info.pop("pending_status_logs", None)
+
+# 🔄 高频更新表的 updated_at 由数据库触发器维护 (UPDATE语句不再携带 updated_at)
+TOUCH_TABLES = ("projects", "tasks")
+
+def touch_trigger_ddl(table: str) -> List[DDL]:
+    """updated_at 触发器DDL (各数据库方言分别执行)"""
+    return [
+        DDL("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+            BEGIN NEW.updated_at = TIMEZONE('utc', now()); RETURN NEW; END
+            $$ LANGUAGE plpgsql
+        """).execute_if(dialect="postgresql"),
+        DDL(f"CREATE TRIGGER trg_{table}_touch BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()").execute_if(dialect="postgresql"),
+        DDL(f"CREATE TRIGGER trg_{table}_touch BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW SET NEW.updated_at = UTC_TIMESTAMP()").execute_if(dialect="mysql"),
+        # SQLite没有BEFORE UPDATE修改NEW的能力，更新后回写 (未显式修改 updated_at 时)
+        DDL(f"CREATE TRIGGER trg_{table}_touch AFTER UPDATE ON {table} "
+            f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at "
+            f"BEGIN UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END").execute_if(dialect="sqlite"),
+    ]
+
+# 三元组索引依赖 pg_trgm 扩展
+event.listen(Project.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+for _table in TOUCH_TABLES:
+    for _ddl in touch_trigger_ddl(_table):
+        event.listen(Base.metadata.tables[_table], "after_create", _ddl)
 
 # 多对多关联表
 task_suppliers = Table('task_suppliers', Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id')),
     Column('supplier_id', Integer, ForeignKey('suppliers.id'))
-)
\ No newline at end of file
+)
+
+# 🔍 预加载查询 (避免N+1)
+# 多对一关系用 joinedload (单次JOIN)，一对多集合用 selectinload (一次 IN 查询)，
+# 其余关系 raiseload，意外的懒加载会直接报错而不是逐行发起SELECT
+def task_list_query() -> Select:
+    """任务列表查询 (TaskResponse 所需的所属项目及其负责人、执行人、创建人一次JOIN查出)"""
+    project = joinedload(Task.project, innerjoin=True)
+    return select(Task).options(
+        project.undefer_group('project_text'),  # ProjectResponse 含 requirements/notes
+        project.joinedload(Project.creator),
+        project.joinedload(Project.designer),
+        project.joinedload(Project.sales),
+        joinedload(Task.assignee),
+        joinedload(Task.creator),
+        raiseload('*')
+    )
+
+# 📥 批量写入 (状态日志/AI对话/财务记录等只追加的表)
+BULK_COPY_THRESHOLD = 100
+
+def _copy_text_value(value: Any) -> str:
+    """转换为COPY text格式的字段值"""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def bulk_copy(db: Session, model: type, rows: List[Dict[str, Any]]) -> int:
+    """
+    批量写入多行记录
+    PostgreSQL(psycopg2)且行数达到阈值时使用 COPY ... FROM STDIN，
+    否则回退到 insert(Model) 的多行VALUES批量插入
+    """
+    if not rows:
+        return 0
+    
+    connection = db.connection()
+    dialect = connection.dialect
+    if dialect.name != "postgresql" or len(rows) < BULK_COPY_THRESHOLD:
+        return bulk_insert(db, model, rows)
+    
+    cursor = connection.connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return bulk_insert(db, model, rows)
+    
+    # COPY不会执行Python端默认值，这里补齐缺省列 (如 tags)
+    # 自增主键和数据库端默认值 (如 created_at) 未提供时不写入，由数据库生成
+    columns = [
+        column for column in model.__table__.columns
+        if column.key in rows[0] or not (
+            (column.primary_key and column.autoincrement) or column.server_default is not None
+        )
+    ]
+    defaults = {
+        column.key: column.default for column in columns
+        if column.default is not None and (column.default.is_scalar or column.default.is_callable)
+    }
+    processors = {
+        column.key: column.type.dialect_impl(dialect).bind_processor(dialect)
+        for column in columns
+    }
+    
+    buffer = io.StringIO()
+    for row in rows:
+        values = []
+        for column in columns:
+            if column.key in row:
+                value = row[column.key]
+            elif column.key in defaults:
+                default = defaults[column.key]
+                value = default.arg(None) if default.is_callable else default.arg
+            else:
+                value = None
+            processor = processors[column.key]
+            if processor is not None and value is not None:
+                value = processor(value)
+            values.append(_copy_text_value(value))
+        buffer.write("\t".join(values) + "\n")
+    buffer.seek(0)
+    
+    column_names = ", ".join(column.name for column in columns)
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({column_names}) FROM STDIN WITH (FORMAT text)",
+            buffer
+        )
+    finally:
+        cursor.close()
+    return len(rows)
+
+# ⚙️ 系统配置进程内缓存
+class SystemConfigCache:
+    """
+    系统配置缓存 (整表加载到dict，按版本号失效)
+    PostgreSQL下通过 LISTEN system_config 接收变更推送，读取无需访问数据库；
+    其他数据库每隔 VERSION_CHECK_INTERVAL 秒检查一次版本号
+    """
+
+    VERSION_CHECK_INTERVAL = 30.0
+
+    def __init__(self):
+        self._cache: Dict[str, str] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._listening = False
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """标记缓存失效 (下次读取时重新加载)"""
+        self._stale = True
+
+    def get(self, db: Session, key: str, default: Optional[str] = None) -> Optional[str]:
+        """读取配置值"""
+        self._ensure_fresh(db)
+        return self._cache.get(key, default)
+
+    def get_all(self, db: Session) -> Dict[str, str]:
+        """读取全部配置"""
+        self._ensure_fresh(db)
+        return dict(self._cache)
+
+    def _ensure_fresh(self, db: Session):
+        now = time.monotonic()
+        if not self._stale and (self._listening or now - self._checked_at < self.VERSION_CHECK_INTERVAL):
+            return
+
+        with self._lock:
+            version = db.execute(select(SystemConfigVersion.version).where(SystemConfigVersion.id == 1)).scalar() or 0
+            if self._stale or version != self._version:
+                rows = db.execute(select(SystemConfig.config_key, SystemConfig.config_value)).all()
+                self._cache = {key: value for key, value in rows}
+                self._version = version
+                self._stale = False
+            self._checked_at = now
+
+    def start_listener(self) -> bool:
+        """启动 LISTEN 线程 (仅PostgreSQL + psycopg2)，返回是否启动"""
+        if self._listening or not settings.is_postgresql:
+            return self._listening
+        try:
+            # 独立连接，不占用连接池
+            connect_args, connect_kwargs = engine.dialect.create_connect_args(engine.url)
+            connection = engine.dialect.connect(*connect_args, **connect_kwargs)
+            if not hasattr(connection, "notifies"):
+                connection.close()
+                return False
+            connection.autocommit = True
+            connection.cursor().execute("LISTEN system_config")
+        except Exception as e:
+            print(f"⚠️  系统配置监听启动失败: {e}")
+            return False
+
+        self._listening = True
+        self.invalidate()
+        threading.Thread(target=self._listen, args=(connection,), name="system-config-listener", daemon=True).start()
+        return True
+
+    def _listen(self, connection):
+        try:
+            while True:
+                if _select.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                if connection.notifies:
+                    connection.notifies.clear()
+                    self.invalidate()
+        except Exception as e:
+            print(f"⚠️  系统配置监听中断，改为轮询版本号: {e}")
+        finally:
+            self._listening = False
+            self.invalidate()
+            connection.close()
+
+system_config_cache = SystemConfigCache()
+
+DEFAULT_PROJECT_NUMBER_PREFIX = "PRJ"
+
+def generate_project_number(db: Session) -> str:
+    """生成项目编号: 前缀 + 日期 + 序号 (前缀取系统配置 project_number_prefix)"""
+    prefix = system_config_cache.get(
+        db, ConfigKeyEnum.PROJECT_NUMBER_PREFIX.value, DEFAULT_PROJECT_NUMBER_PREFIX
+    ) or DEFAULT_PROJECT_NUMBER_PREFIX
+    project_count = db.execute(select(func.count(Project.id))).scalar()
+    return f"{prefix}{datetime.now().strftime('%Y%m%d')}{project_count + 1:03d}"
@@ -5,9 +5,10 @@ AI管理系统 - 监控模块
 提供系统健康检查、性能监控等功能
 """
 
-from .health import HealthMonitor, get_health_monitor
+from .health import HealthMonitor, get_health_monitor, close_health_monitor
 
 __all__ = [
     "HealthMonitor",
-    "get_health_monitor"
+    "get_health_monitor",
+    "close_health_monitor"
 ]
\ No newline at end of file
@@ -6,27 +6,103 @@ AI管理系统 - 系统健康监控
 """
 
 import asyncio
+import contextlib
+import json
 import time
+import httpx
 import psutil
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from sqlalchemy import text
+import sys
+from collections import Counter, deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Any, NamedTuple, Optional, Tuple
+from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
-from app.database import get_db_context, test_connection, get_db_status
+from app.database import health_engine, get_health_db_context, test_connection, get_db_status
 from app.config import get_settings
-from app.ai.service import get_ai_service
 from app.ai.monitor import get_ai_monitor
 from app.wechat.bot import get_wechat_bot
+from app.permissions import get_permission_audit_stats
 
 settings = get_settings()
 
+# 同时进行的组件探测上限 (健康检查接口被频繁调用时，避免对数据库/AI服务/外网的探测请求成倍放大)
+MAX_CONCURRENT_HEALTH_CHECKS = 10
+
+# 单项检查的最长等待时间(秒): 任一依赖卡住时整体检查耗时不超过其中最大值
+HEALTH_CHECK_TIMEOUTS = {
+    "system": 2.0,
+    "database": 3.0,
+    "ai": 5.0,
+    "wechat": 3.0,
+    "network": 2.0
+}
+
+# 检查结果缓存时间(秒): 存活探针/页面轮询/指标采集频繁调用时直接返回最近结果
+HEALTH_CACHE_TTL = {
+    "quick": 5.0,
+    "comprehensive": 30.0,
+    "disk": 30.0
+}
+
+# 健康检查中统计记录数的主要表
+TABLES_TO_CHECK = [
+    ("users", "用户表"),
+    ("projects", "项目表"),
+    ("tasks", "任务表"),
+    ("suppliers", "供应商表")
+]
+TABLE_COUNT_CACHE_TTL = 300.0  # SQLite精确计数的缓存时间(秒)
+
+# 预先构造的统计语句 (表名固定，不在每次检查时拼接SQL)
+_PG_TABLE_ESTIMATE = text(
+    "SELECT relname, reltuples::bigint FROM pg_class "
+    "WHERE relkind IN ('r', 'p') AND relname = ANY(:names) "
+    "AND relnamespace = current_schema()::regnamespace"
+)
+_MYSQL_TABLE_ESTIMATE = text(
+    "SELECT table_name, table_rows FROM information_schema.tables "
+    "WHERE table_schema = DATABASE() AND table_name IN :names"
+).bindparams(bindparam("names", expanding=True))
+_COUNT_STMTS = {
+    table_name: text(f"SELECT COUNT(*) FROM {table_name}")
+    for table_name, _ in TABLES_TO_CHECK
+}
+
+DIAGNOSTICS_REFRESH_INTERVAL = 60.0  # 后台刷新全面检查的间隔(秒)
+SYSTEM_SAMPLE_INTERVAL = 15.0  # 后台采样进程数/负载的间隔(秒)
+SYSTEM_SNAPSHOT_TTL = 1.0  # 系统资源快照复用时间(秒)，快速检查和全面检查接连触发时只采集一次
+
+HEALTH_HISTORY_SIZE = 100  # 保留最近的健康检查记录数
+HEALTH_SUMMARY_WINDOW = 10  # 健康汇总统计最近的检查次数
+
+# 外网连通性探测
+NETWORK_PROBE_URL = "https://www.baidu.com"
+NETWORK_PROBE_TIMEOUT = 2.0
+
+_LINUX = sys.platform.startswith("linux")
+
+class MemoryInfo(NamedTuple):
+    """系统内存 (字节)"""
+    total: int
+    available: int
+    used: int
+    percent: float
+
+class HealthHistoryEntry(NamedTuple):
+    """健康历史记录 (payload 为序列化后的检查结果摘要)"""
+    checked_at: float
+    status: str
+    timestamp: Optional[str]
+    cpu_percent: float
+    memory_percent: float
+    payload: bytes
+
 class HealthMonitor:
     """系统健康监控器"""
     
     def __init__(self):
-        self.ai_service = get_ai_service()
         self.ai_monitor = get_ai_monitor()
         
         # 健康检查配置
@@ -39,12 +115,47 @@ class HealthMonitor:
             "api_response_time_max": 2.0    # API响应时间上限(秒)
         }
         
-        self.health_history = []
+        # 按时间顺序追加，超出上限自动淘汰最早的记录
+        # 摘要保存时即序列化为JSON字节，读取历史时直接拼接，不再逐条构造字典
+        self.health_history: Deque[HealthHistoryEntry] = deque(maxlen=HEALTH_HISTORY_SIZE)
+        
+        # 最近 HEALTH_SUMMARY_WINDOW 次检查的CPU/内存累加和及状态计数，保存历史时增量更新
+        self._summary_cpu_total = 0.0
+        self._summary_memory_total = 0.0
+        self._summary_status_counts: Counter = Counter()
+        
+        # cpu_percent(interval=None) 返回距上次调用的CPU使用率，首次调用无意义，这里预先调用一次
+        psutil.cpu_percent(interval=None)
+        self._process = psutil.Process()
+        self._process.cpu_percent(interval=None)
+        self._snapshot_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
+        # 后台采样 (进程数需遍历进程表，不在每次检查时采集)，由 start() 启动
+        self._latest_sys: Optional[Dict[str, Any]] = None
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._diagnostics_task: Optional[asyncio.Task] = None
+        self._started_at = time.monotonic()
+        self._disk_usage: Optional[Tuple[float, Any]] = None
+        self._table_counts: Optional[Tuple[float, Dict[str, int]]] = None
+        
+        # 复用的异步HTTP客户端 (网络探测不阻塞事件循环，连接可保持复用)
+        self._http = httpx.AsyncClient(timeout=NETWORK_PROBE_TIMEOUT)
+        
+        # 并发控制: 组件探测限流 + 结果缓存 (同时到达的调用共享一次检查)
+        self._check_semaphore = asyncio.Semaphore(MAX_CONCURRENT_HEALTH_CHECKS)
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
         print("✅ 健康监控器初始化完成")
     
     async def comprehensive_health_check(self) -> Dict[str, Any]:
         """全面健康检查"""
-        start_time = time.time()
+        return await self._cached(
+            "comprehensive", HEALTH_CACHE_TTL["comprehensive"], self._run_comprehensive_health_check
+        )
+    
+    async def _run_comprehensive_health_check(self) -> Dict[str, Any]:
+        """执行全面健康检查"""
+        start_time = time.monotonic()
         
         health_status = {
             "timestamp": datetime.now().isoformat(),
@@ -55,24 +166,30 @@ class HealthMonitor:
             "performance": {}
         }
         
-        # 1. 系统资源检查
-        system_health = await self._check_system_resources()
-        health_status["components"]["system"] = system_health
+        # 系统资源快照只采集一次，系统资源检查和性能指标共用
+        snapshot = self._try_snapshot()
         
-        # 2. 数据库健康检查
-        database_health = await self._check_database_health()
-        health_status["components"]["database"] = database_health
+        # 各项检查互不依赖，并发执行 (总耗时取决于最慢的一项)
+        # 1. 系统资源 2. 数据库 3. AI服务 4. 企业微信 5. 应用性能
+        results = await asyncio.gather(
+            self._bounded("system", self._guarded(self._check_system_resources(snapshot))),
+            self._bounded("database", self._guarded(self._check_database_health())),
+            self._bounded("ai", self._guarded(self._check_ai_services())),
+            self._bounded("wechat", self._guarded(self._check_wechat_health())),
+            self._bounded("network", self._guarded(self._check_performance_metrics(snapshot))),
+            return_exceptions=True
+        )
         
-        # 3. AI服务健康检查
-        ai_health = await self._check_ai_services()
-        health_status["components"]["ai"] = ai_health
+        # 单项检查抛出的异常记为critical，不影响其他检查结果
+        system_health, database_health, ai_health, wechat_health, performance_metrics = [
+            {"status": "critical", "error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
         
-        # 4. 企业微信健康检查
-        wechat_health = await self._check_wechat_health()
+        health_status["components"]["system"] = system_health
+        health_status["components"]["database"] = database_health
+        health_status["components"]["ai"] = ai_health
         health_status["components"]["wechat"] = wechat_health
-        
-        # 5. 应用性能检查
-        performance_metrics = await self._check_performance_metrics()
         health_status["performance"] = performance_metrics
         
         # 汇总状态
@@ -88,7 +205,7 @@ class HealthMonitor:
             health_status["status"] = "warning"
         
         # 记录检查时间
-        health_status["check_duration"] = round(time.time() - start_time, 3)
+        health_status["check_duration"] = round(time.monotonic() - start_time, 3)
         
         # 保存健康历史
         self._save_health_history(health_status)
@@ -97,84 +214,162 @@ class HealthMonitor:
     
     async def quick_health_check(self) -> Dict[str, Any]:
         """快速健康检查"""
-        start_time = time.time()
+        return await self._cached("quick", HEALTH_CACHE_TTL["quick"], self._run_quick_health_check)
+    
+    async def _run_quick_health_check(self) -> Dict[str, Any]:
+        """执行快速健康检查"""
+        start_time = time.monotonic()
         
         health_status = {
             "timestamp": datetime.now().isoformat(),
             "status": "healthy",
-            "database": await self._quick_database_check(),
+            "database": await self._bounded("database", self._guarded(self._quick_database_check())),
             "ai_service": await self._quick_ai_check(),
-            "system_load": self._get_system_load(),
+            "system_load": self._get_system_load(self._try_snapshot()),
             "check_duration": 0
         }
         
         # 简单状态评估
-        if not health_status["database"]["connected"]:
+        if not health_status["database"].get("connected"):
             health_status["status"] = "critical"
         elif health_status["system_load"]["cpu_percent"] > 90:
             health_status["status"] = "warning"
         
-        health_status["check_duration"] = round(time.time() - start_time, 3)
+        health_status["check_duration"] = round(time.monotonic() - start_time, 3)
         
         return health_status
     
+    # 分层检查: 存活探针 → 就绪探针 → 诊断
+    def liveness(self) -> Dict[str, Any]:
+        """存活检查 (进程能响应即存活，不访问任何外部依赖)"""
+        return {
+            "status": "alive",
+            "timestamp": datetime.now().isoformat(),
+            "uptime_seconds": round(time.monotonic() - self._started_at, 1)
+        }
+    
+    async def readiness(self) -> Dict[str, Any]:
+        """就绪检查 (数据库 SELECT 1 + 系统负载，结果缓存 HEALTH_CACHE_TTL["quick"] 秒)"""
+        return await self.quick_health_check()
+    
+    async def diagnostics(self) -> Dict[str, Any]:
+        """诊断信息 (返回后台定时刷新的最近一次全面检查，尚无结果时当场检查)"""
+        cached = self._cache.get("comprehensive")
+        if cached is not None:
+            return cached[1]
+        return await self.comprehensive_health_check()
+    
+    async def start(self):
+        """启动后台任务: 系统采样 + 全面检查定时刷新 (需在事件循环中调用)"""
+        if self._sampler_task is None or self._sampler_task.done():
+            self._latest_sys = self._collect_sys()
+            self._sampler_task = asyncio.create_task(self._sampler_loop())
+        if self._diagnostics_task is None or self._diagnostics_task.done():
+            self._diagnostics_task = asyncio.create_task(self._diagnostics_loop())
+    
+    async def close(self):
+        """停止后台任务，释放HTTP客户端连接"""
+        for task in (self._sampler_task, self._diagnostics_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._sampler_task = self._diagnostics_task = None
+        await self._http.aclose()
+    
     async def get_health_history(self, hours: int = 24) -> List[Dict[str, Any]]:
         """获取健康历史"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        return json.loads(await self.get_health_history_json(hours))
+    
+    async def get_health_history_json(self, hours: int = 24) -> bytes:
+        """获取健康历史 (JSON数组字节，可直接作为响应体返回)"""
+        cutoff = time.time() - hours * 3600
         
-        return [
-            record for record in self.health_history
-            if datetime.fromisoformat(record["timestamp"]) > cutoff_time
-        ]
+        # 记录按时间递增，从最新一条向前扫描到截止时间即可
+        payloads = []
+        for entry in reversed(self.health_history):
+            if entry.checked_at <= cutoff:
+                break
+            payloads.append(entry.payload)
+        payloads.reverse()
+        return b"[" + b",".join(payloads) + b"]"
     
     def get_health_summary(self) -> Dict[str, Any]:
-        """获取健康汇总"""
-        if not self.health_history:
+        """获取健康汇总 (最近 HEALTH_SUMMARY_WINDOW 次检查，直接读取累加值)"""
+        count = min(HEALTH_SUMMARY_WINDOW, len(self.health_history))
+        if count <= 0:
             return {"message": "No health data available"}
         
-        recent_checks = self.health_history[-10:]  # 最近10次检查
-        
-        # 计算平均性能指标
-        avg_cpu = sum(check.get("performance", {}).get("cpu_usage", 0) for check in recent_checks) / len(recent_checks)
-        avg_memory = sum(check.get("performance", {}).get("memory_usage", 0) for check in recent_checks) / len(recent_checks)
-        
-        # 统计状态分布
-        status_counts = {}
-        for check in recent_checks:
-            status = check.get("status", "unknown")
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
         return {
-            "recent_checks": len(recent_checks),
-            "avg_cpu_usage": round(avg_cpu, 2),
-            "avg_memory_usage": round(avg_memory, 2),
-            "status_distribution": status_counts,
-            "last_check": recent_checks[-1]["timestamp"] if recent_checks else None
+            "recent_checks": count,
+            "avg_cpu_usage": round(self._summary_cpu_total / count, 2),
+            "avg_memory_usage": round(self._summary_memory_total / count, 2),
+            "status_distribution": dict(self._summary_status_counts),
+            "last_check": self.health_history[-1].timestamp
         }
     
     # 私有方法
-    async def _check_system_resources(self) -> Dict[str, Any]:
-        """检查系统资源"""
+    async def _cached(
+        self, key: str, ttl: float, check: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        在ttl秒内返回缓存的检查结果
+        缓存过期时只执行一次检查，检查进行中到达的调用等待同一结果
+        """
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh_cache(key, check))
+            self._inflight[key] = task
+        # shield: 单个调用方取消 (如客户端断开) 不会取消共享的检查
+        return await asyncio.shield(task)
+    
+    async def _refresh_cache(self, key: str, check: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """执行检查并写入缓存"""
         try:
-            # CPU使用率
-            cpu_percent = psutil.cpu_percent(interval=1)
+            result = await check()
+            self._cache[key] = (time.monotonic(), result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _guarded(self, check: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        """在并发上限内执行组件探测"""
+        async with self._check_semaphore:
+            return await check
+    
+    async def _bounded(self, name: str, check: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        """限时执行单项检查，超时记为unhealthy (超时时间见 HEALTH_CHECK_TIMEOUTS)"""
+        timeout = HEALTH_CHECK_TIMEOUTS[name]
+        try:
+            return await asyncio.wait_for(check, timeout)
+        except asyncio.TimeoutError:
+            return {"status": "unhealthy", "error": f"{name} timed out after {timeout}s"}
+    
+    async def _check_system_resources(self, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """检查系统资源 (snapshot 为调用方已采集的系统快照)"""
+        try:
+            if snapshot is None:
+                snapshot = self._snapshot()
+            
+            # CPU使用率 (非阻塞，取距上次采集的平均值)
+            cpu_percent = snapshot["cpu_percent"]
             
             # 内存使用情况
-            memory = psutil.virtual_memory()
+            memory = snapshot["memory"]
             memory_percent = memory.percent
             
-            # 磁盘使用情况
-            disk = psutil.disk_usage('/')
+            # 磁盘使用情况 (变化缓慢，短时间内复用)
+            disk = self._get_disk_usage()
             disk_percent = (disk.used / disk.total) * 100
             
-            # 进程信息
-            process_count = len(psutil.pids())
-            
-            # 负载平均值 (Linux/Mac)
-            try:
-                load_avg = os.getloadavg()
-            except (OSError, AttributeError):
-                load_avg = [0, 0, 0]  # Windows不支持
+            # 进程数和负载 (后台定时采样，未启动采样时当场采集)
+            sampled = self._latest_sys or self._collect_sys()
+            process_count = sampled["process_count"]
+            load_avg = sampled["load_average"]
             
             status = "healthy"
             warnings = []
@@ -202,7 +397,9 @@ class HealthMonitor:
                     "disk_percent": round(disk_percent, 2),
                     "disk_free_gb": round(disk.free / (1024**3), 2),
                     "process_count": process_count,
-                    "load_average": [round(x, 2) for x in load_avg]
+                    "app_process": snapshot["process"],
+                    "load_average": [round(x, 2) for x in load_avg],
+                    "sampled_at": sampled["sampled_at"]
                 }
             }
             
@@ -214,13 +411,17 @@ class HealthMonitor:
             }
     
     async def _check_database_health(self) -> Dict[str, Any]:
-        """检查数据库健康"""
+        """检查数据库健康 (同步数据库调用在线程池中执行，不阻塞事件循环)"""
+        return await asyncio.to_thread(self._sync_db_probe)
+    
+    def _sync_db_probe(self) -> Dict[str, Any]:
+        """数据库连接、状态和表记录数探测"""
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             
             # 测试连接
-            db_connected = test_connection()
-            connection_time = time.time() - start_time
+            db_connected = test_connection(health_engine)
+            connection_time = time.monotonic() - start_time
             
             if not db_connected:
                 return {
@@ -230,17 +431,17 @@ class HealthMonitor:
                 }
             
             # 获取数据库状态
-            db_status = get_db_status()
+            db_status = get_db_status(health_engine)
             
             # 测试查询性能
-            with get_db_context() as db:
-                query_start = time.time()
-                result = db.execute(text("SELECT COUNT(*) FROM users"))
-                user_count = result.scalar()
-                query_time = time.time() - query_start
+            with get_health_db_context() as db:
+                query_start = time.monotonic()
+                db.execute(text("SELECT 1")).scalar()
+                query_time = time.monotonic() - query_start
                 
                 # 检查表状态
-                table_checks = await self._check_database_tables(db)
+                table_checks = self._check_database_tables(db)
+                user_count = table_checks.get("users", {}).get("record_count")
             
             status = "healthy"
             warnings = []
@@ -270,33 +471,29 @@ class HealthMonitor:
                 "error": str(e)
             }
     
-    async def _check_database_tables(self, db: Session) -> Dict[str, Any]:
-        """检查数据库表状态"""
+    def _check_database_tables(self, db: Session) -> Dict[str, Any]:
+        """
+        检查数据库表状态 (记录数为估算值)
+        PostgreSQL读取 pg_class.reltuples，MySQL读取 information_schema，一次查询取全部表；
+        SQLite无统计信息，精确计数并缓存 TABLE_COUNT_CACHE_TTL 秒
+        """
         table_checks = {}
         
         try:
-            # 检查主要表的记录数
-            tables_to_check = [
-                ("users", "用户表"),
-                ("projects", "项目表"),
-                ("tasks", "任务表"),
-                ("suppliers", "供应商表")
-            ]
-            
-            for table_name, description in tables_to_check:
-                try:
-                    result = db.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                    count = result.scalar()
+            counts = self._estimate_table_counts(db, [name for name, _ in TABLES_TO_CHECK])
+            
+            for table_name, description in TABLES_TO_CHECK:
+                if table_name in counts:
                     table_checks[table_name] = {
                         "description": description,
-                        "record_count": count,
+                        "record_count": counts[table_name],
                         "status": "ok"
                     }
-                except Exception as e:
+                else:
                     table_checks[table_name] = {
                         "description": description,
                         "status": "error",
-                        "error": str(e)
+                        "error": "表不存在"
                     }
             
         except Exception as e:
@@ -304,6 +501,30 @@ class HealthMonitor:
         
         return table_checks
     
+    def _estimate_table_counts(self, db: Session, tables: List[str]) -> Dict[str, int]:
+        """各表的(估算)记录数，不存在的表不出现在结果中"""
+        dialect = db.get_bind().dialect.name
+        
+        if dialect == "postgresql":
+            # reltuples 由 VACUUM/ANALYZE 维护，从未分析过的表为 -1
+            rows = db.execute(_PG_TABLE_ESTIMATE, {"names": tables}).all()
+            return {name: max(count, 0) for name, count in rows}
+        
+        if dialect == "mysql":
+            rows = db.execute(_MYSQL_TABLE_ESTIMATE, {"names": tables}).all()
+            return {name: int(count or 0) for name, count in rows}
+        
+        now = time.monotonic()
+        if self._table_counts is None or now - self._table_counts[0] >= TABLE_COUNT_CACHE_TTL:
+            counts = {}
+            for table_name in tables:
+                try:
+                    counts[table_name] = db.execute(_COUNT_STMTS[table_name]).scalar()
+                except Exception:
+                    continue
+            self._table_counts = (now, counts)
+        return self._table_counts[1]
+    
     async def _check_ai_services(self) -> Dict[str, Any]:
         """检查AI服务健康"""
         try:
@@ -314,8 +535,8 @@ class HealthMonitor:
             status = "healthy"
             warnings = []
             
-            # 检查错误率
-            if ai_stats["success_rate"] < (100 - self.health_thresholds["ai_error_rate_max"]):
+            # 检查错误率 (最近1小时无调用时不判断)
+            if ai_stats["total_calls"] and ai_stats["success_rate"] < (100 - self.health_thresholds["ai_error_rate_max"]):
                 status = "warning"
                 warnings.append(f"AI服务错误率过高: {100 - ai_stats['success_rate']:.1f}%")
             
@@ -324,19 +545,10 @@ class HealthMonitor:
                 status = "warning"
                 warnings.append(f"AI服务成本超限: ${daily_stats['cost']:.2f}")
             
-            # 简单测试AI服务
-            test_start = time.time()
-            try:
-                test_response = await self.ai_service.chat_completion(
-                    "系统健康检查测试", 
-                    {"type": "health_check"}
-                )
-                ai_response_time = time.time() - test_start
-                ai_available = True
-            except Exception as e:
-                ai_response_time = time.time() - test_start
-                ai_available = False
-                warnings.append(f"AI服务测试失败: {str(e)}")
+            # 根据真实调用记录判断可用性，不额外发起付费的模型调用
+            ai_available = ai_stats["total_calls"] == 0 or ai_stats["success_rate"] > 0
+            if not ai_available:
+                warnings.append(f"AI服务最近1小时 {ai_stats['total_calls']} 次调用全部失败")
                 status = "unhealthy"
             
             return {
@@ -346,7 +558,7 @@ class HealthMonitor:
                 "metrics": {
                     "hourly_stats": ai_stats,
                     "daily_stats": daily_stats,
-                    "response_time": round(ai_response_time, 3),
+                    "response_time": ai_stats.get("avg_latency", 0),
                     "api_limits": self.ai_monitor.daily_limits
                 }
             }
@@ -390,29 +602,23 @@ class HealthMonitor:
                 "error": str(e)
             }
     
-    async def _check_performance_metrics(self) -> Dict[str, Any]:
-        """检查性能指标"""
+    async def _check_performance_metrics(self, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """检查性能指标 (snapshot 为调用方已采集的系统快照)"""
         try:
             # 系统负载
-            system_load = self._get_system_load()
+            system_load = self._get_system_load(snapshot)
             
             # 应用启动时间 (简单估算)
+            uptime_hours = (time.time() - psutil.boot_time()) / 3600
+            
+            # 网络连接测试 (HEAD请求，不下载响应体)
+            network_start = time.monotonic()
             try:
-                boot_time = psutil.boot_time()
-                uptime_seconds = time.time() - boot_time
-                uptime_hours = uptime_seconds / 3600
-            except:
-                uptime_hours = 0
-            
-            # 网络连接测试
-            network_start = time.time()
-            try:
-                import requests
-                response = requests.get("https://www.baidu.com", timeout=5)
-                network_latency = time.time() - network_start
-                network_available = response.status_code == 200
-            except:
-                network_latency = time.time() - network_start
+                response = await self._http.head(NETWORK_PROBE_URL)
+                network_latency = time.monotonic() - network_start
+                network_available = response.is_success
+            except httpx.HTTPError:
+                network_latency = time.monotonic() - network_start
                 network_available = False
             
             return {
@@ -421,7 +627,8 @@ class HealthMonitor:
                 "network": {
                     "available": network_available,
                     "latency": round(network_latency, 3)
-                }
+                },
+                "permission_audit": get_permission_audit_stats()
             }
             
         except Exception as e:
@@ -429,33 +636,141 @@ class HealthMonitor:
                 "error": str(e)
             }
     
-    def _get_system_load(self) -> Dict[str, Any]:
-        """获取系统负载"""
+    def _snapshot(self) -> Dict[str, Any]:
+        """
+        系统CPU/内存及本进程资源快照 (缓存 SYSTEM_SNAPSHOT_TTL 秒)
+        本进程指标在 oneshot() 内读取，/proc/<pid>/ 下的文件只读取一次
+        """
+        now = time.monotonic()
+        if self._snapshot_cache and now - self._snapshot_cache[0] < SYSTEM_SNAPSHOT_TTL:
+            return self._snapshot_cache[1]
+        
+        with self._process.oneshot():
+            process = {
+                "cpu_percent": round(self._process.cpu_percent(interval=None), 2),
+                "memory_mb": round(self._process.memory_info().rss / (1024**2), 2),
+                "threads": self._process.num_threads()
+            }
+        
+        snapshot = {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory": self._read_memory(),
+            "process": process
+        }
+        self._snapshot_cache = (now, snapshot)
+        return snapshot
+    
+    def _try_snapshot(self) -> Optional[Dict[str, Any]]:
+        """采集系统快照，失败时返回None (由各检查自行采集并报告错误)"""
+        try:
+            return self._snapshot()
+        except Exception:
+            return None
+    
+    def _get_disk_usage(self):
+        """根分区磁盘使用情况 (缓存 HEALTH_CACHE_TTL["disk"] 秒)"""
+        now = time.monotonic()
+        if self._disk_usage is None or now - self._disk_usage[0] >= HEALTH_CACHE_TTL["disk"]:
+            self._disk_usage = (now, psutil.disk_usage('/'))
+        return self._disk_usage[1]
+    
+    async def _sampler_loop(self):
+        """定时采集进程数和负载，检查时直接读取最近一次采样"""
+        while True:
+            await asyncio.sleep(SYSTEM_SAMPLE_INTERVAL)
+            try:
+                # 整体替换引用，读取方不会看到只更新了一半的数据
+                self._latest_sys = self._collect_sys()
+            except Exception as e:
+                print(f"⚠️ 系统采样失败: {e}")
+    
+    async def _diagnostics_loop(self):
+        """定时刷新全面检查结果，diagnostics() 直接返回最近结果"""
+        while True:
+            try:
+                # ttl=0: 总是重新检查 (已有进行中的检查时等待其结果)
+                await self._cached("comprehensive", 0, self._run_comprehensive_health_check)
+            except Exception as e:
+                print(f"⚠️ 后台健康检查失败: {e}")
+            await asyncio.sleep(DIAGNOSTICS_REFRESH_INTERVAL)
+    
+    def _collect_sys(self) -> Dict[str, Any]:
+        """
+        采集进程数和负载平均值
+        Linux读取一次 /proc/loadavg 同时得到两者 (第4列为调度实体总数，含线程，
+        避免 psutil.pids() 遍历 /proc 下所有进程目录)
+        """
+        if _LINUX:
+            try:
+                with open("/proc/loadavg") as f:
+                    fields = f.read().split()
+                return {
+                    "process_count": int(fields[3].split("/")[1]),
+                    "load_average": tuple(float(x) for x in fields[:3]),
+                    "sampled_at": datetime.now().isoformat()
+                }
+            except (OSError, IndexError, ValueError):
+                pass
+        
         try:
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
+            load_avg = os.getloadavg()
+        except (OSError, AttributeError):
+            load_avg = (0, 0, 0)  # Windows不支持
+        
+        return {
+            "process_count": len(psutil.pids()),
+            "load_average": load_avg,
+            "sampled_at": datetime.now().isoformat()
+        }
+    
+    def _read_memory(self) -> MemoryInfo:
+        """系统内存 (Linux直接解析 /proc/meminfo，其他平台使用psutil)"""
+        if _LINUX:
+            try:
+                fields = {}
+                with open("/proc/meminfo") as f:
+                    for line in f:
+                        key, _, value = line.partition(":")
+                        if key in ("MemTotal", "MemAvailable"):
+                            fields[key] = int(value.split()[0]) * 1024  # kB
+                            if len(fields) == 2:
+                                break
+                total, available = fields["MemTotal"], fields["MemAvailable"]
+                return MemoryInfo(total, available, total - available, (total - available) / total * 100)
+            except (OSError, KeyError, ValueError, ZeroDivisionError):
+                pass
+        
+        memory = psutil.virtual_memory()
+        return MemoryInfo(memory.total, memory.available, memory.used, memory.percent)
+    
+    def _get_system_load(self, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """获取系统负载 (snapshot 为调用方已采集的系统快照)"""
+        try:
+            if snapshot is None:
+                snapshot = self._snapshot()
+            memory = snapshot["memory"]
             
             return {
-                "cpu_percent": round(cpu_percent, 2),
+                "cpu_percent": round(snapshot["cpu_percent"], 2),
                 "memory_percent": round(memory.percent, 2),
                 "memory_used_gb": round(memory.used / (1024**3), 2),
                 "memory_total_gb": round(memory.total / (1024**3), 2)
             }
-        except:
+        except (OSError, psutil.Error, KeyError):
             return {}
     
     async def _quick_database_check(self) -> Dict[str, Any]:
         """快速数据库检查"""
         try:
-            start_time = time.time()
-            connected = test_connection()
-            response_time = time.time() - start_time
+            start_time = time.monotonic()
+            connected = await asyncio.to_thread(test_connection, health_engine)
+            response_time = time.monotonic() - start_time
             
             return {
                 "connected": connected,
                 "response_time": round(response_time, 3)
             }
-        except:
+        except (OSError, RuntimeError):
             return {
                 "connected": False,
                 "response_time": 0
@@ -471,7 +786,7 @@ class HealthMonitor:
                 "daily_cost": daily_stats["cost"],
                 "within_limits": daily_stats["cost"] < self.ai_monitor.daily_limits["max_cost"]
             }
-        except:
+        except (KeyError, TypeError):
             return {
                 "daily_calls": 0,
                 "daily_cost": 0,
@@ -479,12 +794,44 @@ class HealthMonitor:
             }
     
     def _save_health_history(self, health_status: Dict[str, Any]):
-        """保存健康检查历史"""
-        self.health_history.append(health_status)
+        """
+        保存健康检查历史，同时更新汇总窗口的累加值 (加入新记录，减去移出窗口的记录)
+        历史只保留汇总字段，不保留各组件的完整指标 (表记录数、AI统计等)
+        """
+        system_load = health_status.get("performance", {}).get("system_load", {})
+        cpu = system_load.get("cpu_percent", 0)
+        memory = system_load.get("memory_percent", 0)
         
-        # 只保留最近100次记录
-        if len(self.health_history) > 100:
-            self.health_history = self.health_history[-100:]
+        record = {
+            "timestamp": health_status.get("timestamp"),
+            "status": health_status.get("status", "unknown"),
+            "components": {
+                name: component.get("status") for name, component in health_status.get("components", {}).items()
+            },
+            "cpu_percent": cpu,
+            "memory_percent": memory,
+            "check_duration": health_status.get("check_duration")
+        }
+        self.health_history.append(HealthHistoryEntry(
+            checked_at=time.time(),
+            status=record["status"],
+            timestamp=record["timestamp"],
+            cpu_percent=cpu,
+            memory_percent=memory,
+            payload=json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ))
+        
+        self._summary_cpu_total += cpu
+        self._summary_memory_total += memory
+        self._summary_status_counts[record["status"]] += 1
+        
+        if len(self.health_history) > HEALTH_SUMMARY_WINDOW:
+            evicted = self.health_history[-HEALTH_SUMMARY_WINDOW - 1]
+            self._summary_cpu_total -= evicted.cpu_percent
+            self._summary_memory_total -= evicted.memory_percent
+            self._summary_status_counts[evicted.status] -= 1
+            if self._summary_status_counts[evicted.status] <= 0:
+                del self._summary_status_counts[evicted.status]
 
 
 # 全局健康监控实例
@@ -495,4 +842,11 @@ def get_health_monitor() -> HealthMonitor:
     global _health_monitor
     if _health_monitor is None:
         _health_monitor = HealthMonitor()
-    return _health_monitor
\ No newline at end of file
+    return _health_monitor
+
+async def close_health_monitor():
+    """关闭健康监控实例 (应用退出时调用)"""
+    global _health_monitor
+    if _health_monitor is not None:
+        await _health_monitor.close()
+        _health_monitor = None
\ No newline at end of file
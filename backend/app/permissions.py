@@ -5,9 +5,15 @@ AI管理系统 - RBAC权限控制系统
 基于角色的访问控制，支持细粒度权限管理
 """
 
-from typing import List, Set, Dict, Optional, Callable
+import atexit
+import sys
+import threading
+from queue import Empty, Full, Queue
+from types import MappingProxyType
+from typing import List, Set, Dict, FrozenSet, Iterable, Mapping, Optional, Callable, Tuple, Union
 from enum import Enum
-from functools import wraps
+from functools import lru_cache, partial, reduce
+import operator
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
 
@@ -15,6 +21,44 @@ from app.models import User, Project
 from app import RoleEnum
 from app.auth import get_current_user, get_current_active_user
 
+__all__ = [
+    "Permission",
+    "PermissionLevel",
+    "ROLE_PERMISSIONS",
+    "ALL_PERMISSIONS",
+    "permission_mask",
+    "bulk_check",
+    "ResourcePermission",
+    "has_permission",
+    "has_any_permission",
+    "has_all_permissions",
+    "get_user_permissions",
+    "bulk_has_permission",
+    "has_permission_by_role",
+    "PermissionChecker",
+    "permission_checker",
+    "PermissionDependency",
+    "RoleDependency",
+    "ResourcePermissionDependency",
+    "PERMISSION_DEPENDS",
+    "ROLE_DEPENDS",
+    "check_permission",
+    "check_project_access",
+    "check_project_modify",
+    "check_financial_access",
+    "require_project_access",
+    "require_project_modify",
+    "require_financial_access",
+    "RequirePermission",
+    "RequireRole",
+    "RequireAnyPermission",
+    "RequireAllPermissions",
+    "PermissionManager",
+    "PermissionAudit",
+    "flush_permission_audit",
+    "get_permission_audit_stats"
+]
+
 class Permission(str, Enum):
     """权限枚举"""
     # 🏢 系统管理权限
@@ -80,51 +124,15 @@ class PermissionLevel(str, Enum):
     WRITE = "write"     # 读写
     ADMIN = "admin"     # 管理权限
 
-# 🎭 角色权限映射
-ROLE_PERMISSIONS: Dict[str, Set[Permission]] = {
-    RoleEnum.ADMIN: {
-        # 管理员拥有所有权限
-        Permission.SYSTEM_ADMIN,
-        Permission.SYSTEM_CONFIG,
-        Permission.SYSTEM_MONITOR,
-        Permission.USER_CREATE,
-        Permission.USER_READ,
-        Permission.USER_UPDATE,
-        Permission.USER_DELETE,
-        Permission.USER_ASSIGN_ROLE,
-        Permission.PROJECT_CREATE,
-        Permission.PROJECT_READ,
-        Permission.PROJECT_UPDATE,
-        Permission.PROJECT_DELETE,
-        Permission.PROJECT_ASSIGN,
-        Permission.PROJECT_STATUS_CHANGE,
-        Permission.PROJECT_FINANCIAL,
-        Permission.TASK_CREATE,
-        Permission.TASK_READ,
-        Permission.TASK_UPDATE,
-        Permission.TASK_DELETE,
-        Permission.TASK_ASSIGN,
-        Permission.SUPPLIER_CREATE,
-        Permission.SUPPLIER_READ,
-        Permission.SUPPLIER_UPDATE,
-        Permission.SUPPLIER_DELETE,
-        Permission.FILE_UPLOAD,
-        Permission.FILE_READ,
-        Permission.FILE_DELETE,
-        Permission.FILE_MANAGE,
-        Permission.FINANCIAL_READ,
-        Permission.FINANCIAL_WRITE,
-        Permission.FINANCIAL_CONFIRM,
-        Permission.FINANCIAL_REPORT,
-        Permission.AI_USE,
-        Permission.AI_MANAGE,
-        Permission.AI_CONVERSATION_VIEW,
-        Permission.REPORT_VIEW,
-        Permission.REPORT_EXPORT,
-        Permission.STATISTICS_VIEW,
-    },
-    
-    RoleEnum.DESIGNER: {
+# 🎭 角色权限映射 (frozenset 不可变，变更时整体替换)
+ALL_PERMISSIONS: FrozenSet[Permission] = frozenset(Permission)
+_NO_PERMISSIONS: FrozenSet[Permission] = frozenset()
+
+ROLE_PERMISSIONS: Dict[str, FrozenSet[Permission]] = {
+    # 管理员拥有所有权限
+    RoleEnum.ADMIN: ALL_PERMISSIONS,
+    
+    RoleEnum.DESIGNER: frozenset({
         # 设计师权限
         Permission.USER_READ,  # 查看用户信息
         Permission.PROJECT_CREATE,  # 创建项目
@@ -140,9 +148,9 @@ ROLE_PERMISSIONS: Dict[str, Set[Permission]] = {
         Permission.FILE_DELETE,    # 删除自己上传的文件
         Permission.AI_USE,         # 使用AI服务
         Permission.REPORT_VIEW,    # 查看报告
-    },
+    }),
     
-    RoleEnum.FINANCE: {
+    RoleEnum.FINANCE: frozenset({
         # 财务权限
         Permission.USER_READ,      # 查看用户信息
         Permission.PROJECT_READ,   # 查看项目
@@ -158,9 +166,9 @@ ROLE_PERMISSIONS: Dict[str, Set[Permission]] = {
         Permission.REPORT_VIEW,    # 查看报告
         Permission.REPORT_EXPORT,  # 导出报告
         Permission.STATISTICS_VIEW,    # 查看统计
-    },
+    }),
     
-    RoleEnum.SALES: {
+    RoleEnum.SALES: frozenset({
         # 销售权限
         Permission.USER_READ,      # 查看用户信息
         Permission.PROJECT_CREATE, # 创建项目
@@ -173,104 +181,179 @@ ROLE_PERMISSIONS: Dict[str, Set[Permission]] = {
         Permission.FILE_READ,      # 查看文件
         Permission.AI_USE,         # 使用AI服务
         Permission.REPORT_VIEW,    # 查看报告
-    }
+    })
+}
+
+# 角色权限的原始字符串值 (内部状态不经过枚举包装，权限矩阵直接使用)
+ROLE_PERMISSIONS_RAW: Dict[str, FrozenSet[str]] = {
+    role: frozenset(perm.value for perm in permissions) for role, permissions in ROLE_PERMISSIONS.items()
+}
+
+# 🔢 权限位图 (内部快速路径): 每个权限占一位，角色权限为各位的按位或
+# _ROLE_MASKS 即按行压缩的 auth(角色, 权限) 布尔矩阵: 每个角色一行整数，第i位对应第i个权限，
+# 查询为一次字典查找 + 一次按位与，角色权限变更时只重算该角色一行
+# 按权限字符串值索引，Permission 成员和原始字符串都可直接查找
+_PERMISSION_BITS: Dict[str, int] = {perm.value: 1 << i for i, perm in enumerate(Permission)}
+_ALL_MASK = (1 << len(Permission)) - 1
+
+def permission_mask(permissions: Iterable[Union[Permission, str]]) -> int:
+    """权限集合对应的位图 (多权限检查可预先计算后传入 has_any_permission / has_all_permissions)"""
+    return reduce(operator.or_, (_PERMISSION_BITS[perm] for perm in permissions), 0)
+
+_ROLE_MASKS: Dict[str, int] = {
+    role: permission_mask(permissions) for role, permissions in ROLE_PERMISSIONS.items()
 }
 
+# 角色权限变更计数，用户对象上缓存的权限位图据此失效
+_role_permissions_version = 0
+
+# 权限矩阵缓存 (角色权限变更时清空)，只读视图，所有调用方共享同一份
+_permission_matrix: Optional[Mapping[str, Tuple[str, ...]]] = None
+
+def bulk_check(role_masks: Iterable[int], permission_bits: Iterable[int]) -> List[bool]:
+    """
+    批量权限检查: 第i项为 role_masks[i] 是否包含 permission_bits[i] 中的任意权限
+    逐项整数按位与，用于审计回放、报表批量过滤等大量检查
+    """
+    return [mask & bits != 0 for mask, bits in zip(role_masks, permission_bits)]
+
+def _set_role_permissions(role: str, permissions: FrozenSet[Permission]):
+    """更新角色权限及其位图"""
+    global _role_permissions_version, _permission_matrix
+    _role_permissions_version += 1
+    _permission_matrix = None
+    ROLE_PERMISSIONS[role] = permissions
+    ROLE_PERMISSIONS_RAW[role] = frozenset(perm.value for perm in permissions)
+    _ROLE_MASKS[role] = permission_mask(permissions)
+
 # 📋 资源权限规则
+_PROJECT_ACCESS_ROLES = frozenset({RoleEnum.ADMIN, RoleEnum.FINANCE})  # 可访问所有项目的角色
+_FINANCIAL_ROLES = frozenset({RoleEnum.ADMIN, RoleEnum.FINANCE})       # 可访问所有财务数据的角色
+
 class ResourcePermission:
     """资源权限规则"""
     
     @staticmethod
     def can_access_project(user: User, project: Project) -> bool:
         """检查用户是否可以访问项目"""
-        # 管理员可以访问所有项目
-        if user.role == RoleEnum.ADMIN or user.is_admin:
-            return True
-        
-        # 项目创建者可以访问
-        if project.creator_id == user.id:
-            return True
-        
-        # 项目负责人可以访问
-        if project.designer_id == user.id:
-            return True
-        
-        # 销售可以访问自己负责的项目
-        if project.sales_id == user.id:
-            return True
-        
-        # 财务可以查看所有项目的财务信息
-        if user.role == RoleEnum.FINANCE:
-            return True
-        
-        return False
+        # 管理员/财务可以访问所有项目，创建者、设计师、销售可以访问自己相关的项目
+        return (
+            user.is_admin
+            or user.role in _PROJECT_ACCESS_ROLES
+            or user.id in (project.creator_id, project.designer_id, project.sales_id)
+        )
     
     @staticmethod
     def can_modify_project(user: User, project: Project) -> bool:
         """检查用户是否可以修改项目"""
-        # 管理员可以修改所有项目
-        if user.role == RoleEnum.ADMIN or user.is_admin:
-            return True
-        
-        # 项目创建者可以修改
-        if project.creator_id == user.id:
-            return True
-        
-        # 项目负责人可以修改
-        if project.designer_id == user.id:
-            return True
-        
-        return False
+        # 管理员可以修改所有项目，创建者和项目负责人可以修改自己的项目
+        return user.is_privileged or user.id in (project.creator_id, project.designer_id)
     
     @staticmethod
     def can_access_financial_data(user: User, project: Project) -> bool:
         """检查用户是否可以访问财务数据"""
-        # 管理员和财务可以访问所有财务数据
-        if user.role in [RoleEnum.ADMIN, RoleEnum.FINANCE] or user.is_admin:
-            return True
-        
-        # 项目创建者可以访问自己项目的财务数据
-        if project.creator_id == user.id:
-            return True
-        
+        # 管理员和财务可以访问所有财务数据，项目创建者可以访问自己项目的财务数据
+        return (
+            user.is_admin
+            or user.role in _FINANCIAL_ROLES
+            or user.id == project.creator_id
+        )
+
+# 🔍 权限检查 (模块级函数，直接读取模块级权限表)
+def _user_mask(user: User) -> int:
+    """
+    用户的权限位图
+    结果缓存在用户对象上，同一请求内的多个权限依赖只计算一次；
+    用户角色/状态变化或角色权限变更后自动重新计算
+    """
+    if not user:
+        return 0
+    
+    key = (_role_permissions_version, user.role, user.is_admin, user.is_active)
+    cached = user.__dict__.get("_permission_cache")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    if not user.is_active:
+        mask = 0
+    elif user.is_admin:
+        mask = _ALL_MASK
+    else:
+        mask = _ROLE_MASKS.get(user.role, 0)
+    user._permission_cache = (key, mask)
+    return mask
+
+def has_permission(user: User, permission: Union[Permission, str]) -> bool:
+    """检查用户是否具有指定权限 (permission 可为 Permission 或其字符串值)"""
+    if not user:
+        return False
+    
+    # 超级管理员拥有所有权限 (最常见的放行情况，先于角色权限判断)
+    if user.is_admin:
+        return bool(user.is_active)
+    
+    if not user.is_active:
         return False
+    
+    # 检查角色权限
+    return bool(_user_mask(user) & _PERMISSION_BITS.get(permission, 0))
+
+def _has_bit_no_active_check(user: User, bit: int) -> bool:
+    """
+    检查已确认启用的用户是否具有权限位 bit
+    get_current_active_user 已校验用户状态，不再重复检查
+    """
+    return user.is_admin or bool(_user_mask(user) & bit)
+
+def _has_any_mask(user: User, mask: int) -> bool:
+    """用户是否具有位图中的任意一个权限"""
+    return bool(_user_mask(user) & mask)
+
+def _has_all_mask(user: User, mask: int) -> bool:
+    """用户是否具有位图中的所有权限"""
+    return _user_mask(user) & mask == mask
+
+def has_any_permission(user: User, permissions: Union[Iterable[Permission], int]) -> bool:
+    """检查用户是否具有任意一个权限 (permissions 可为权限列表或 permission_mask() 位图)"""
+    if not isinstance(permissions, int):
+        # 未知权限不对应任何位，不会放行
+        permissions = reduce(operator.or_, (_PERMISSION_BITS.get(perm, 0) for perm in permissions), 0)
+    return _has_any_mask(user, permissions)
+
+def has_all_permissions(user: User, permissions: Union[Iterable[Permission], int]) -> bool:
+    """检查用户是否具有所有权限 (permissions 可为权限列表或 permission_mask() 位图)"""
+    if not isinstance(permissions, int):
+        permissions = list(permissions)
+        if any(perm not in _PERMISSION_BITS for perm in permissions):
+            return False  # 包含未知权限时拒绝
+        permissions = permission_mask(permissions)
+    return _has_all_mask(user, permissions)
+
+def get_user_permissions(user: User) -> FrozenSet[Permission]:
+    """获取用户的所有权限 (只读集合)"""
+    if not user or not user.is_active:
+        return _NO_PERMISSIONS
+    
+    if user.is_admin:
+        return ALL_PERMISSIONS
+    
+    return ROLE_PERMISSIONS.get(user.role, _NO_PERMISSIONS)
+
+def bulk_has_permission(users: List[User], permission: Permission) -> List[bool]:
+    """批量检查多个用户是否具有指定权限 (返回与users等长的布尔列表)"""
+    bit = _PERMISSION_BITS.get(permission, 0)
+    return [_user_mask(user) & bit != 0 for user in users]
 
 class PermissionChecker:
-    """权限检查器"""
+    """权限检查器 (兼容入口，方法即上面的模块级函数)"""
     
-    def __init__(self):
-        self.role_permissions = ROLE_PERMISSIONS
+    __slots__ = ()
     
-    def has_permission(self, user: User, permission: Permission) -> bool:
-        """检查用户是否具有指定权限"""
-        if not user or not user.is_active:
-            return False
-        
-        # 超级管理员拥有所有权限
-        if user.is_admin:
-            return True
-        
-        # 检查角色权限
-        user_permissions = self.role_permissions.get(user.role, set())
-        return permission in user_permissions
-    
-    def has_any_permission(self, user: User, permissions: List[Permission]) -> bool:
-        """检查用户是否具有任意一个权限"""
-        return any(self.has_permission(user, perm) for perm in permissions)
-    
-    def has_all_permissions(self, user: User, permissions: List[Permission]) -> bool:
-        """检查用户是否具有所有权限"""
-        return all(self.has_permission(user, perm) for perm in permissions)
-    
-    def get_user_permissions(self, user: User) -> Set[Permission]:
-        """获取用户的所有权限"""
-        if not user or not user.is_active:
-            return set()
-        
-        if user.is_admin:
-            return set(Permission)
-        
-        return self.role_permissions.get(user.role, set())
+    has_permission = staticmethod(has_permission)
+    has_any_permission = staticmethod(has_any_permission)
+    has_all_permissions = staticmethod(has_all_permissions)
+    get_user_permissions = staticmethod(get_user_permissions)
+    bulk_has_permission = staticmethod(bulk_has_permission)
 
 # 全局权限检查器实例
 permission_checker = PermissionChecker()
@@ -279,34 +362,43 @@ permission_checker = PermissionChecker()
 class PermissionDependency:
     """权限依赖类 - 用于FastAPI路由"""
     
+    __slots__ = ("permission", "bit", "detail")
+    
     def __init__(self, permission: Permission):
         self.permission = permission
+        self.bit = _PERMISSION_BITS[permission]  # 权限位在创建依赖时确定，请求时只做一次按位与
+        self.detail = f"Permission denied: {permission.value}"
     
     def __call__(self, current_user: User = Depends(get_current_active_user)):
-        if not permission_checker.has_permission(current_user, self.permission):
+        if not _has_bit_no_active_check(current_user, self.bit):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permission denied: {self.permission.value}"
+                detail=self.detail
             )
         return current_user
 
 class RoleDependency:
     """角色依赖类 - 用于FastAPI路由"""
     
+    __slots__ = ("role", "detail")
+    
     def __init__(self, role: str):
         self.role = role
+        self.detail = f"Role required: {role}"
     
     def __call__(self, current_user: User = Depends(get_current_active_user)):
-        if current_user.role != self.role and not current_user.is_admin:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Role required: {self.role}"
-            )
-        return current_user
+        if current_user.is_admin or current_user.role == self.role:
+            return current_user
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=self.detail
+        )
 
 class ResourcePermissionDependency:
     """资源权限依赖类"""
     
+    __slots__ = ("resource_type", "action")
+    
     def __init__(self, resource_type: str, action: str = "read"):
         self.resource_type = resource_type
         self.action = action
@@ -318,7 +410,11 @@ class ResourcePermissionDependency:
 # 🎯 便捷权限检查函数
 def check_permission(user: User, permission: Permission) -> bool:
     """检查用户权限"""
-    return permission_checker.has_permission(user, permission)
+    return has_permission(user, permission)
+
+def has_permission_by_role(role: str, permission: Union[Permission, str]) -> bool:
+    """检查角色是否具有指定权限 (只看角色权限，不考虑用户状态和超级管理员标记)"""
+    return bool(_ROLE_MASKS.get(role, 0) & _PERMISSION_BITS.get(permission, 0))
 
 def check_project_access(user: User, project: Project) -> bool:
     """检查项目访问权限"""
@@ -332,59 +428,71 @@ def check_financial_access(user: User, project: Project) -> bool:
     """检查财务数据访问权限"""
     return ResourcePermission.can_access_financial_data(user, project)
 
-def require_project_access(user: User, project: Project):
-    """要求项目访问权限"""
-    if not check_project_access(user, project):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No access to this project"
-        )
-
-def require_project_modify(user: User, project: Project):
-    """要求项目修改权限"""
-    if not check_project_modify(user, project):
+def _require(check: Callable[[User, Project], bool], user: User, project: Project, *, detail: str):
+    """资源权限检查不通过时返回403"""
+    if not check(user, project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="No permission to modify this project"
+            detail=detail
         )
 
-def require_financial_access(user: User, project: Project):
-    """要求财务数据访问权限"""
-    if not check_financial_access(user, project):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No access to financial data"
-        )
+# 要求项目访问/项目修改/财务数据访问权限 (直接调用 ResourcePermission 的检查方法)
+require_project_access = partial(
+    _require, ResourcePermission.can_access_project, detail="No access to this project"
+)
+require_project_modify = partial(
+    _require, ResourcePermission.can_modify_project, detail="No permission to modify this project"
+)
+require_financial_access = partial(
+    _require, ResourcePermission.can_access_financial_data, detail="No access to financial data"
+)
 
 # 🛡️ 便捷权限装饰器工厂 (简化版本)
+# 相同参数返回同一个依赖对象，FastAPI按依赖对象去重，同一请求内只执行一次
+# 权限和角色都是固定枚举，依赖对象在导入时预先创建，定义路由时只做字典查找
+PERMISSION_DEPENDS: Dict[Permission, PermissionDependency] = {
+    perm: PermissionDependency(perm) for perm in Permission
+}
+ROLE_DEPENDS: Dict[str, RoleDependency] = {role: RoleDependency(role) for role in RoleEnum}
+
 def RequirePermission(permission: Permission):
     """权限依赖工厂函数 - 推荐使用"""
-    return PermissionDependency(permission)
+    return PERMISSION_DEPENDS[permission]
 
 def RequireRole(role: str):
     """角色依赖工厂函数 - 推荐使用"""
-    return RoleDependency(role)
+    dependency = ROLE_DEPENDS.get(role)
+    if dependency is None:
+        dependency = ROLE_DEPENDS[role] = RoleDependency(role)
+    return dependency
+
+def _permission_key(permissions: List[Permission]) -> tuple:
+    """权限列表的缓存键 (与顺序无关)"""
+    return tuple(sorted(Permission._value2member_map_[p] for p in permissions))
 
 def RequireAnyPermission(permissions: List[Permission]):
     """多权限依赖工厂函数"""
-    def permission_dependency(current_user: User = Depends(get_current_active_user)):
-        if not permission_checker.has_any_permission(current_user, permissions):
-            permission_list = [p.value for p in permissions]
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permission denied: requires any of {permission_list}"
-            )
-        return current_user
-    return permission_dependency
+    return _mask_dependency("any", _permission_key(permissions))
 
 def RequireAllPermissions(permissions: List[Permission]):
     """全权限依赖工厂函数"""
+    return _mask_dependency("all", _permission_key(permissions))
+
+_MASK_CHECKS = {"any": _has_any_mask, "all": _has_all_mask}
+
+@lru_cache(maxsize=None)
+def _mask_dependency(mode: str, permissions: tuple):
+    """多权限依赖 (mode 为 any/all，按 mode + 权限元组缓存)"""
+    # 检查函数、权限位图和拒绝信息在定义路由时生成一次
+    check = _MASK_CHECKS[mode]
+    mask = permission_mask(permissions)
+    detail = f"Permission denied: requires {mode} of {[p.value for p in permissions]}"
+    
     def permission_dependency(current_user: User = Depends(get_current_active_user)):
-        if not permission_checker.has_all_permissions(current_user, permissions):
-            permission_list = [p.value for p in permissions]
+        if not check(current_user, mask):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permission denied: requires all of {permission_list}"
+                detail=detail
             )
         return current_user
     return permission_dependency
@@ -394,36 +502,38 @@ class PermissionManager:
     """权限管理器"""
     
     @staticmethod
-    def get_role_permissions(role: str) -> Set[Permission]:
+    def get_role_permissions(role: str) -> FrozenSet[Permission]:
         """获取角色的所有权限"""
-        return ROLE_PERMISSIONS.get(role, set())
+        return ROLE_PERMISSIONS.get(role, _NO_PERMISSIONS)
     
     @staticmethod
     def add_role_permission(role: str, permission: Permission):
-        """为角色添加权限"""
-        if role not in ROLE_PERMISSIONS:
-            ROLE_PERMISSIONS[role] = set()
-        ROLE_PERMISSIONS[role].add(permission)
+        """为角色添加权限 (权限集合不可变，整体替换)"""
+        if has_permission_by_role(role, permission):
+            return
+        _set_role_permissions(role, ROLE_PERMISSIONS.get(role, _NO_PERMISSIONS) | {permission})
     
     @staticmethod
     def remove_role_permission(role: str, permission: Permission):
         """从角色移除权限"""
-        if role in ROLE_PERMISSIONS:
-            ROLE_PERMISSIONS[role].discard(permission)
+        if has_permission_by_role(role, permission):
+            _set_role_permissions(role, ROLE_PERMISSIONS[role] - {permission})
     
     @staticmethod
-    def get_permission_matrix() -> Dict[str, List[str]]:
-        """获取权限矩阵"""
-        return {
-            role: [perm.value for perm in permissions]
-            for role, permissions in ROLE_PERMISSIONS.items()
-        }
+    def get_permission_matrix() -> Mapping[str, Tuple[str, ...]]:
+        """获取权限矩阵 (缓存的只读结果，需要修改时请先复制)"""
+        global _permission_matrix
+        if _permission_matrix is None:
+            _permission_matrix = MappingProxyType({
+                role: tuple(sorted(values)) for role, values in ROLE_PERMISSIONS_RAW.items()
+            })
+        return _permission_matrix
     
     @staticmethod
     def validate_permission_change(user: User, target_user: User, new_permissions: List[Permission]) -> bool:
         """验证权限变更是否合法"""
         # 只有管理员可以修改权限
-        if user.role != RoleEnum.ADMIN and not user.is_admin:
+        if not user.is_privileged:
             return False
         
         # 不能修改自己的权限
@@ -433,16 +543,93 @@ class PermissionManager:
         return True
 
 # 📈 权限审计
+# 审计记录先放入队列，由后台线程批量写出，请求处理中不做同步输出
+AUDIT_ENABLED = True
+AUDIT_BATCH_SIZE = 256     # 每次最多合并写出的记录数
+AUDIT_QUEUE_SIZE = 10000   # 队列上限，写出跟不上时丢弃新记录，不阻塞请求
+
+_audit_queue: Queue = Queue(maxsize=AUDIT_QUEUE_SIZE)
+_audit_dropped = 0  # 因队列已满丢弃的记录数
+_audit_dropped_reported = 0  # 已写出提示的丢弃数 (只由写出方更新)
+_audit_writer: Optional[threading.Thread] = None
+_audit_writer_lock = threading.Lock()
+
+def _write_audit_batch(batch: list):
+    """格式化并一次写出一批审计记录"""
+    sys.stdout.write("".join(
+        f"AUDIT: User {username} ({role}) "
+        f"{'GRANTED' if granted else 'DENIED'} permission {permission} "
+        f"for resource {resource or 'system'}\n"
+        for username, role, permission, granted, resource in batch
+    ))
+    sys.stdout.flush()
+
+def _drain_audit_queue(first=None):
+    """取出队列中已有的记录 (最多 AUDIT_BATCH_SIZE 条) 并写出"""
+    batch = [] if first is None else [first]
+    while len(batch) < AUDIT_BATCH_SIZE:
+        try:
+            batch.append(_audit_queue.get_nowait())
+        except Empty:
+            break
+    if batch:
+        _write_audit_batch(batch)
+    _report_audit_dropped()
+
+def _report_audit_dropped():
+    """丢弃数有增加时随审计记录写出一行提示"""
+    global _audit_dropped_reported
+    dropped = _audit_dropped
+    if dropped > _audit_dropped_reported:
+        sys.stdout.write(
+            f"AUDIT: dropped {dropped - _audit_dropped_reported} records (queue full, {dropped} total)\n"
+        )
+        sys.stdout.flush()
+        _audit_dropped_reported = dropped
+
+def _audit_writer_loop():
+    """审计写出线程: 阻塞等待第一条记录，再合并队列中的其余记录"""
+    while True:
+        _drain_audit_queue(_audit_queue.get())
+
+def _ensure_audit_writer():
+    """首次记录审计时启动写出线程"""
+    global _audit_writer
+    if _audit_writer is not None:
+        return
+    with _audit_writer_lock:
+        if _audit_writer is None:
+            _audit_writer = threading.Thread(target=_audit_writer_loop, name="permission-audit", daemon=True)
+            _audit_writer.start()
+
+@atexit.register
+def flush_permission_audit():
+    """写出队列中剩余的审计记录 (进程退出时自动调用)"""
+    while not _audit_queue.empty():
+        _drain_audit_queue()
+    _report_audit_dropped()
+
+def get_permission_audit_stats() -> Dict[str, int]:
+    """审计队列状态 (待写出记录数、因队列已满丢弃的记录数)"""
+    return {
+        "queued": _audit_queue.qsize(),
+        "dropped": _audit_dropped
+    }
+
 class PermissionAudit:
     """权限审计"""
     
     @staticmethod
     def log_permission_check(user: User, permission: Permission, granted: bool, resource: str = None):
-        """记录权限检查日志"""
-        # 这里可以记录到数据库或日志文件
-        print(f"AUDIT: User {user.username} ({user.role}) "
-              f"{'GRANTED' if granted else 'DENIED'} permission {permission.value} "
-              f"for resource {resource or 'system'}")
+        """记录权限检查日志 (异步批量写出)"""
+        global _audit_dropped
+        if not AUDIT_ENABLED:
+            return
+        _ensure_audit_writer()
+        try:
+            _audit_queue.put_nowait((user.username, user.role, permission.value, granted, resource))
+        except Full:
+            _audit_dropped += 1
     
     @staticmethod
     def get_user_permission_history(user: User, days: int = 30) -> List[dict]:
@@ -454,7 +641,7 @@ class PermissionAudit:
 """
 使用示例:
 
-1. 在FastAPI路由中使用权限依赖:
+1. 在FastAPI路由中使用权限依赖 (路由权限统一通过 Depends 声明，不使用装饰器):
 
 @router.get("/admin-only")
 async def admin_endpoint(user: User = Depends(RequireRole(RoleEnum.ADMIN))):
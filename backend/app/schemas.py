@@ -6,8 +6,9 @@ AI管理系统 - Pydantic数据模式
 """
 
 from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 from app import StatusEnum, RoleEnum
 
 # ==================== 基础响应模型 ====================
@@ -22,8 +23,20 @@ class ResponseData(ResponseBase):
     """带数据的响应模型"""
     data: Any
 
-class PaginationMeta(BaseModel):
-    """分页元数据"""
+class TrustedORMResponse(BaseModel):
+    """由数据库行构造的响应模型基类"""
+    
+    @classmethod
+    def from_orm_trusted(cls, obj):
+        """
+        直接从ORM对象构造，跳过字段校验 (数据库数据视为可信)
+        只用于不含嵌套模型字段的响应模型，嵌套对象仍需 model_validate
+        """
+        return cls.model_construct(**{name: getattr(obj, name) for name in cls.model_fields})
+
+@dataclass(slots=True, frozen=True)
+class PaginationMeta:
+    """分页元数据 (服务端计算，普通dataclass，作为字段时不再逐字段校验)"""
     page: int
     page_size: int
     total: int
@@ -47,13 +60,7 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     """用户创建模型"""
-    password: str = Field(..., min_length=6)
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 6:
-            raise ValueError('密码长度至少6位')
-        return v
+    password: str = Field(..., min_length=6)  # 长度由 pydantic-core 校验
 
 class UserUpdate(BaseModel):
     """用户更新模型"""
@@ -62,7 +69,7 @@ class UserUpdate(BaseModel):
     role: Optional[RoleEnum] = None
     is_active: Optional[bool] = None
 
-class UserResponse(UserBase):
+class UserResponse(UserBase, TrustedORMResponse):
     """用户响应模型"""
     id: int
     is_active: bool
@@ -159,6 +166,17 @@ class ProjectStatusUpdate(BaseModel):
     status: str
     reason: Optional[str] = None
 
+class ProjectListItem(BaseModel):
+    """项目列表精简项 (表格视图只需这几列，不带关联用户)"""
+    id: int
+    project_number: Optional[str]
+    project_name: str
+    status: Optional[StatusEnum]
+    deadline: Optional[date]
+    
+    class Config:
+        from_attributes = True
+
 class ProjectListResponse(BaseModel):
     """项目列表响应模型"""
     items: List[ProjectResponse]
@@ -248,7 +266,7 @@ class SupplierUpdate(BaseModel):
     is_preferred: Optional[bool] = None
     notes: Optional[str] = None
 
-class SupplierResponse(SupplierBase):
+class SupplierResponse(SupplierBase, TrustedORMResponse):
     """供应商响应模型"""
     id: int
     created_at: datetime
@@ -307,8 +325,9 @@ class AIMessageResponse(BaseModel):
 
 # ==================== 统计报告模型 ====================
 
-class ProjectStatistics(BaseModel):
-    """项目统计模型"""
+@dataclass(slots=True, frozen=True)
+class ProjectStatistics:
+    """项目统计模型 (服务端计算)"""
     total: int
     ongoing: int
     completed: int
@@ -327,4 +346,13 @@ class DashboardData(BaseModel):
 
 # 更新前向引用
 ProjectDetailResponse.model_rebuild()
-TaskResponse.model_rebuild()
\ No newline at end of file
+TaskResponse.model_rebuild()
+
+# 列表接口使用的类型适配器 (导入时构建一次，整个列表一次校验/序列化)
+PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectResponse])
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+PROJECT_LIST_ITEM_ADAPTER = TypeAdapter(List[ProjectListItem])
+
+# 单对象接口直接返回适配器输出，不再经过路由的 response_model 二次校验
+PROJECT_ADAPTER = TypeAdapter(ProjectResponse)
+TASK_ADAPTER = TypeAdapter(TaskResponse)
\ No newline at end of file
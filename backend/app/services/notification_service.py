@@ -6,6 +6,7 @@ AI管理系统 - 通知服务
 """
 
 import asyncio
+import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -425,19 +426,20 @@ class NotificationService:
         try:
             recipient = self.db.query(User).filter(User.id == recipient_id).first()
             
-            conversation = AIConversation(
-                user_id=recipient_id,
-                project_id=related_project_id,
-                wechat_userid=recipient.wechat_userid or f"user_{recipient_id}",
-                message_type="notification",
-                user_message=f"[系统通知] {title}",
-                ai_response=content,
-                intent=notification_type,
-                confidence=1.0,
-                created_at=datetime.utcnow()
-            )
-            
-            self.db.add(conversation)
+            AIConversation.bulk_log(self.db, [{
+                "user_id": recipient_id,
+                "wechat_userid": recipient.wechat_userid or f"user_{recipient_id}",
+                "message_type": "notification",
+                "user_message": f"[系统通知] {title}",
+                "ai_response": content,
+                "context_data": json.dumps({
+                    "notification_type": notification_type,
+                    "project_id": related_project_id,
+                    "task_id": related_task_id,
+                    "priority": priority
+                }, ensure_ascii=False),
+                "created_at": datetime.utcnow()
+            }])
             self.db.commit()
             
         except Exception as e:
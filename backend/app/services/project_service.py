@@ -11,7 +11,7 @@ from decimal import Decimal
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
-from app.models import Project, User, Task, ProjectStatusLog, FinancialRecord
+from app.models import Project, User, Task, ProjectStatusLog, FinancialRecord, generate_project_number
 from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
 from app.auth import get_current_user
 from app.permissions import Permission, check_permission
@@ -278,8 +278,7 @@ class ProjectService:
     def _create_project_record(self, project_data: ProjectCreate, creator: User) -> Project:
         """创建项目记录"""
         # 生成项目编号
-        project_count = self.db.query(func.count(Project.id)).scalar()
-        project_number = f"PRJ{datetime.now().strftime('%Y%m%d')}{project_count + 1:03d}"
+        project_number = generate_project_number(self.db)
         
         project = Project(
             project_number=project_number,
@@ -360,7 +359,7 @@ class ProjectService:
         
         if new_status not in valid_transitions.get(old_status, []):
             # 管理员可以进行任意状态变更
-            if not (operator.is_admin or operator.role == RoleEnum.ADMIN):
+            if not operator.is_privileged:
                 raise ProjectBusinessException(f"不允许从 {old_status} 直接变更为 {new_status}")
     
     def _handle_status_side_effects(self, project: Project, old_status: str, new_status: str) -> List[str]:
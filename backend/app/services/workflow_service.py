@@ -388,15 +388,14 @@ class WorkflowEngine:
         context.project.updated_at = datetime.utcnow()
         
         # 记录状态变更日志
-        status_log = ProjectStatusLog(
+        ProjectStatusLog.queue(
+            self.db,
             project_id=context.project.id,
             user_id=0,  # 系统自动操作
             from_status=old_status,
             to_status=target_status,
-            change_reason="工作流自动更新",
-            created_at=datetime.utcnow()
+            change_reason="工作流自动更新"
         )
-        self.db.add(status_log)
         self.db.commit()
         
         return {
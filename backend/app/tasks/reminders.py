@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
 from app.database import get_db_context
-from app.models import Project, Task, User, AIConversation, FinancialRecord
+from app.models import Project, Task, User, AIConversation, AIConversationBody, FinancialRecord
 from app.services.notification_service import NotificationService
 from app.ai.service import get_ai_service
 from app import StatusEnum, RoleEnum
@@ -461,10 +461,10 @@ class ReminderEngine:
         # 检查最近2小时内的AI对话，看是否有需要人工处理的情况
         two_hours_ago = datetime.now() - timedelta(hours=2)
         
-        recent_conversations = db.query(AIConversation).filter(
+        recent_conversations = db.query(AIConversation).join(AIConversation.body).filter(
             and_(
                 AIConversation.created_at >= two_hours_ago,
-                AIConversation.ai_response.like("%请联系%")  # 包含"请联系"的回复可能需要人工处理
+                AIConversationBody.ai_response.like("%请联系%")  # 包含"请联系"的回复可能需要人工处理
             )
         ).all()
         
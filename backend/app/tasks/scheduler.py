@@ -17,7 +17,7 @@ from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.asyncio import AsyncIOExecutor
 
 from sqlalchemy.orm import Session
-from app.database import get_db_context
+from app.database import get_db_context, maintain_ai_conversation_partitions, prewarm_pool
 from app.config import get_settings
 from app.tasks.reminders import get_reminder_engine
 from app.services.workflow_service import get_workflow_engine
@@ -385,17 +385,29 @@ class TaskScheduler:
             # 清理过期日志、临时文件等
             cleanup_date = datetime.now() - timedelta(days=30)
             
+            # PostgreSQL: 维护AI对话按月分区 (预建下月分区、分离过期分区)
+            partition_result = maintain_ai_conversation_partitions()
+            if "skipped" not in partition_result:
+                print(f"🗓️ AI对话分区维护完成: {partition_result}")
+            
             with get_db_context() as db:
                 # 清理30天前的AI对话记录（可选）
-                from app.models import AIConversation
+                from app.models import AIConversation, AIConversationBody
                 old_conversations = db.query(AIConversation).filter(
                     AIConversation.created_at < cleanup_date
                 ).count()
                 
                 if old_conversations > 1000:  # 如果记录太多，清理一些
-                    db.query(AIConversation).filter(
+                    old_ids = [row.id for row in db.query(AIConversation.id).filter(
                         AIConversation.created_at < cleanup_date
-                    ).limit(500).delete()
+                    ).order_by(AIConversation.created_at).limit(500)]
+                    # 正文表无外键级联，需同时删除
+                    db.query(AIConversationBody).filter(
+                        AIConversationBody.id.in_(old_ids)
+                    ).delete(synchronize_session=False)
+                    db.query(AIConversation).filter(
+                        AIConversation.id.in_(old_ids)
+                    ).delete(synchronize_session=False)
                     db.commit()
                     print(f"🗑️ 清理了 500 条旧对话记录")
             
@@ -418,11 +430,27 @@ def get_scheduler() -> TaskScheduler:
 
 async def init_scheduler():
     """初始化并启动调度器"""
+    try:
+        await prewarm_pool()
+    except Exception as e:
+        # 预热失败不影响启动，首批请求会按需建立连接
+        print(f"⚠️  数据库连接池预热失败: {e}")
+    
     scheduler = get_scheduler()
     await scheduler.start()
+    
+    from app.monitoring.health import get_health_monitor
+    await get_health_monitor().start()
+    
+    # PostgreSQL下监听配置变更，系统配置读取直接走进程内缓存
+    from app.models import system_config_cache
+    system_config_cache.start_listener()
     return scheduler
 
 async def shutdown_scheduler():
     """关闭调度器"""
     scheduler = get_scheduler()
-    await scheduler.stop()
\ No newline at end of file
+    await scheduler.stop()
+    
+    from app.monitoring.health import close_health_monitor
+    await close_health_monitor()
\ No newline at end of file
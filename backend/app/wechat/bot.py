@@ -216,16 +216,15 @@ class WeChatBot:
                 else:
                     user_message = f"[{msg_type}消息]"
                 
-                conversation = AIConversation(
-                    wechat_userid=wechat_userid,
-                    user_id=user.id if user else None,
-                    message_type=msg_type,
-                    user_message=user_message,
-                    ai_response=ai_response,
-                    processing_time=processing_time,
-                    created_at=datetime.utcnow()
-                )
-                db.add(conversation)
+                AIConversation.bulk_log(db, [{
+                    "wechat_userid": wechat_userid,
+                    "user_id": user.id if user else None,
+                    "message_type": msg_type,
+                    "user_message": user_message,
+                    "ai_response": ai_response,
+                    "processing_time": processing_time,
+                    "created_at": datetime.utcnow()
+                }])
                 # get_db_context 会自动commit
                 
         except Exception as e:
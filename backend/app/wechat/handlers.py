@@ -13,12 +13,16 @@ from datetime import datetime, date
 
 from sqlalchemy.orm import Session
 from app.database import get_db_context
-from app.models import User, Project, Task, Supplier
+from app.models import User, Project, Task, Supplier, generate_project_number
 from app.wechat.utils import WeChatUtils
 from app.ai.service import get_ai_service
 from app.ai.ocr import get_ocr_service
 from app import StatusEnum
 
+# 消息解析正则 (模块级预编译，每条消息复用)
+MENTION_PATTERN = re.compile(r"@AI[运营]*总管\s*")
+NON_AMOUNT_PATTERN = re.compile(r"[^\d.]")
+
 class MessageHandler:
     """消息处理器"""
     
@@ -59,7 +63,7 @@ class MessageHandler:
         
         # 处理@机器人的消息
         if content.startswith("@AI总管") or content.startswith("@AI运营总管"):
-            content = re.sub(r"@AI[运营]*总管\s*", "", content).strip()
+            content = MENTION_PATTERN.sub("", content).strip()
         
         # 空消息处理
         if not content:
@@ -844,8 +848,7 @@ class MessageHandler:
         try:
             with get_db_context() as db:
                 # 生成项目编号
-                project_count = db.query(Project).count()
-                project_number = f"PRJ{datetime.now().strftime('%Y%m%d')}{project_count + 1:03d}"
+                project_number = generate_project_number(db)
                 
                 # 创建项目
                 project = Project(
@@ -899,7 +902,7 @@ class MessageHandler:
         
         try:
             # 清理字符串
-            cleaned = re.sub(r'[^\d.]', '', str(amount_str))
+            cleaned = NON_AMOUNT_PATTERN.sub('', str(amount_str))
             return float(cleaned) if cleaned else None
         except ValueError:
             return None
@@ -33,6 +33,8 @@ class Settings(BaseSettings):
         default="sqlite:///./data/ai_manager.db",
         description="数据库连接URL"
     )
+    QUERY_CACHE_SIZE: int = Field(default=1200, description="SQLAlchemy SQL编译缓存条目数")
+    PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=1024, description="asyncpg预编译语句缓存条目数")
     
     # 🤖 AI服务配置
     CLAUDE_API_KEY: Optional[str] = Field(default=None, description="Claude API密钥")
@@ -89,6 +91,11 @@ class Settings(BaseSettings):
         """判断是否使用MySQL数据库"""
         return self.DATABASE_URL.startswith('mysql:')
     
+    @property
+    def is_postgresql(self) -> bool:
+        """判断是否使用PostgreSQL数据库"""
+        return self.DATABASE_URL.startswith('postgresql:')
+    
     @property
     def is_production(self) -> bool:
         """判断是否为生产环境"""
@@ -108,18 +115,49 @@ class Settings(BaseSettings):
         """获取数据库配置字典"""
         if self.is_sqlite:
             return {
-                "echo": self.DEBUG,  # 开发环境显示SQL
+                "echo": False,  # SQL日志由 sqlalchemy.engine logger 控制
+                "echo_pool": False,
                 "pool_pre_ping": True,
+                "query_cache_size": self.QUERY_CACHE_SIZE,
                 "connect_args": {"check_same_thread": False}  # SQLite特殊配置
             }
         else:
-            return {
-                "echo": self.DEBUG,
+            config = {
+                "echo": False,
+                "echo_pool": False,
                 "pool_size": 10,
                 "max_overflow": 20,
                 "pool_pre_ping": True,
-                "pool_recycle": 3600  # 1小时回收连接
+                "pool_recycle": 3600,  # 1小时回收连接
+                "query_cache_size": self.QUERY_CACHE_SIZE,
+                # 批量INSERT合并为多行VALUES，每批500行避免超过max_allowed_packet
+                "insertmanyvalues_page_size": 500
+            }
+            if self.is_postgresql:
+                config["executemany_mode"] = "values_plus_batch"
+            return config
+    
+    def get_async_database_config(self) -> dict:
+        """获取异步数据库引擎配置字典 (API请求使用)"""
+        config = {
+            "echo": False,
+            "echo_pool": False,
+            "pool_pre_ping": True,
+            "query_cache_size": self.QUERY_CACHE_SIZE
+        }
+        if not self.is_sqlite:
+            config.update({
+                "pool_size": 20,
+                "max_overflow": 10,
+                "pool_recycle": 3600
+            })
+        if self.is_postgresql:
+            # asyncpg在服务端预编译语句并按连接缓存，重复查询跳过解析/规划
+            config["connect_args"] = {
+                "statement_cache_size": self.PREPARED_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": self.PREPARED_STATEMENT_CACHE_SIZE
             }
+        return config
     
     class Config:
         """Pydantic配置"""
@@ -241,22 +241,13 @@ def create_indexes():
                 ON projects(creator_id, created_at);
             """))
             
-            # 任务表索引
-            connection.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_tasks_project_status 
-                ON tasks(project_id, status);
-            """))
-            
+            # 任务表索引 (project_id, status 已在模型中声明为 ix_task_project_status)
             connection.execute(text("""
                 CREATE INDEX IF NOT EXISTS idx_tasks_assignee_due 
                 ON tasks(assignee_id, due_date);
             """))
             
-            # AI对话表索引
-            connection.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_ai_conversations_user_date 
-                ON ai_conversations(wechat_userid, created_at);
-            """))
+            # AI对话表索引 (wechat_userid, created_at) 已在模型中声明
             
             # 文件表索引
             connection.execute(text("""
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 002 AI对话表按月分区
+ai_conversations 只追加、按时间查询，PostgreSQL下改为按 created_at 范围分区，
+旧月份可直接分离归档，避免大批量 DELETE 带来的膨胀和锁等待
+"""
+
+from datetime import date, datetime
+from sqlalchemy import text
+from app.database import engine, create_ai_conversation_partition, _add_months
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "002"
+MIGRATION_NAME = "ai_conversation_partitions"
+MIGRATION_DESCRIPTION = "AI对话表按月分区 (仅PostgreSQL)"
+
+def is_partitioned(connection) -> bool:
+    """ai_conversations 是否已是分区表"""
+    return bool(connection.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = 'ai_conversations'
+        );
+    """)).scalar())
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        print("⏭️  非PostgreSQL数据库，跳过分区迁移 (由每日清理任务按保留期删除)")
+        return
+
+    try:
+        with engine.begin() as connection:
+            if is_partitioned(connection):
+                print("✅ ai_conversations 已是分区表")
+                return
+
+            # 1. 分区键不允许为空
+            print("🧹 补全空的 created_at...")
+            connection.execute(text(
+                "UPDATE ai_conversations SET created_at = TIMEZONE('utc', now()) WHERE created_at IS NULL;"
+            ))
+
+            # 2. 旧表改名，创建分区父表
+            print("📊 创建分区表...")
+            connection.execute(text(
+                "ALTER TABLE ai_conversations RENAME TO ai_conversations_unpartitioned;"
+            ))
+            connection.execute(text("""
+                CREATE TABLE ai_conversations (
+                    LIKE ai_conversations_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED
+                ) PARTITION BY RANGE (created_at);
+            """))
+            connection.execute(text(
+                "ALTER TABLE ai_conversations ALTER COLUMN created_at SET NOT NULL;"
+            ))
+            # 分区表主键必须包含分区键
+            connection.execute(text(
+                "ALTER TABLE ai_conversations ADD PRIMARY KEY (id, created_at);"
+            ))
+            connection.execute(text(
+                "ALTER SEQUENCE ai_conversations_id_seq OWNED BY ai_conversations.id;"
+            ))
+
+            # 3. 默认分区 + 已有数据月份到下个月的月分区
+            print("🗓️ 创建月分区...")
+            connection.execute(text(
+                "CREATE TABLE IF NOT EXISTS ai_conversations_default "
+                "PARTITION OF ai_conversations DEFAULT;"
+            ))
+            oldest = connection.execute(text(
+                "SELECT min(created_at) FROM ai_conversations_unpartitioned;"
+            )).scalar()
+            this_month = date.today().replace(day=1)
+            month = oldest.date().replace(day=1) if oldest else this_month
+            while month <= _add_months(this_month, 1):
+                create_ai_conversation_partition(connection, month)
+                month = _add_months(month, 1)
+
+            # 4. 迁移数据
+            print("📝 迁移历史数据...")
+            connection.execute(text(
+                "INSERT INTO ai_conversations SELECT * FROM ai_conversations_unpartitioned;"
+            ))
+            connection.execute(text("DROP TABLE ai_conversations_unpartitioned;"))
+
+            # 5. 索引和外键
+            print("🔍 创建索引...")
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_ai_conversation_created_brin
+                ON ai_conversations USING brin (created_at) WITH (pages_per_range = 32);
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_ai_conversation_user_created
+                ON ai_conversations (wechat_userid, created_at);
+            """))
+            connection.execute(text("""
+                ALTER TABLE ai_conversations
+                ADD FOREIGN KEY (user_id) REFERENCES users (id);
+            """))
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (合并回普通表)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        return
+
+    try:
+        with engine.begin() as connection:
+            if not is_partitioned(connection):
+                print("ℹ️  ai_conversations 不是分区表，无需回滚")
+                return
+
+            connection.execute(text(
+                "ALTER TABLE ai_conversations RENAME TO ai_conversations_partitioned;"
+            ))
+            connection.execute(text("""
+                CREATE TABLE ai_conversations (
+                    LIKE ai_conversations_partitioned INCLUDING DEFAULTS INCLUDING GENERATED,
+                    PRIMARY KEY (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                );
+            """))
+            connection.execute(text(
+                "INSERT INTO ai_conversations SELECT * FROM ai_conversations_partitioned;"
+            ))
+            connection.execute(text(
+                "ALTER SEQUENCE ai_conversations_id_seq OWNED BY ai_conversations.id;"
+            ))
+            # 删除父表会一并删除所有分区
+            connection.execute(text("DROP TABLE ai_conversations_partitioned;"))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_ai_conversation_created_brin
+                ON ai_conversations USING brin (created_at) WITH (pages_per_range = 32);
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_ai_conversation_user_created
+                ON ai_conversations (wechat_userid, created_at);
+            """))
+
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    with engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO migration_history
+            (version, name, description, executed_at, execution_time)
+            VALUES (:version, :name, :description, :executed_at, :execution_time)
+            ON CONFLICT (version) DO NOTHING;
+        """), {
+            "version": MIGRATION_VERSION,
+            "name": MIGRATION_NAME,
+            "description": MIGRATION_DESCRIPTION,
+            "executed_at": datetime.utcnow(),
+            "execution_time": 0.0
+        })
+
+def check_migration_status():
+    """检查迁移状态"""
+    if not settings.is_postgresql:
+        return True
+
+    try:
+        with engine.connect() as connection:
+            return is_partitioned(connection)
+    except Exception as e:
+        print(f"⚠️  无法检查迁移状态: {e}")
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("AI对话表无需分区迁移")
+    else:
+        print("开始执行分区迁移...")
+        upgrade()
+
+    print("=" * 50)
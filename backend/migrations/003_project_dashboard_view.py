@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 003 项目看板汇总视图
+按项目预聚合收入、支出和未完成任务数，看板直接读取 ProjectDashboard
+PostgreSQL 使用物化视图 (状态变更后防抖刷新)，其他数据库使用普通视图
+"""
+
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "003"
+MIGRATION_NAME = "project_dashboard_view"
+MIGRATION_DESCRIPTION = "项目看板汇总视图 (PostgreSQL物化视图)"
+
+# 财务和任务分别先聚合再关联，避免两个一对多JOIN相乘导致金额重复累加
+# 金额按分存储 (见 008 迁移)，视图中换算为元
+PROJECT_DASHBOARD_SELECT = """
+    SELECT p.id, p.status, p.designer_id,
+           COALESCE(f.income, 0) AS income,
+           COALESCE(f.expense, 0) AS expense,
+           COALESCE(t.open_tasks, 0) AS open_tasks
+    FROM projects p
+    LEFT JOIN (
+        SELECT project_id,
+               SUM(CASE WHEN record_type = 'income' THEN amount END) / 100.0 AS income,
+               SUM(CASE WHEN record_type = 'expense' THEN amount END) / 100.0 AS expense
+        FROM financial_records
+        GROUP BY project_id
+    ) f ON f.project_id = p.id
+    LEFT JOIN (
+        SELECT project_id, COUNT(*) AS open_tasks
+        FROM tasks
+        WHERE status <> 'completed'
+        GROUP BY project_id
+    ) t ON t.project_id = p.id
+"""
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                print("📊 创建物化视图...")
+                connection.execute(text(
+                    f"CREATE MATERIALIZED VIEW IF NOT EXISTS project_dashboard_mv AS {PROJECT_DASHBOARD_SELECT};"
+                ))
+                # REFRESH ... CONCURRENTLY 需要唯一索引
+                connection.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS ux_project_dashboard_mv_id "
+                    "ON project_dashboard_mv (id);"
+                ))
+            else:
+                print("📊 创建普通视图 (当前数据库不支持物化视图)...")
+                connection.execute(text("DROP VIEW IF EXISTS project_dashboard_mv;"))
+                connection.execute(text(
+                    f"CREATE VIEW project_dashboard_mv AS {PROJECT_DASHBOARD_SELECT};"
+                ))
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (删除视图)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                connection.execute(text("DROP MATERIALIZED VIEW IF EXISTS project_dashboard_mv;"))
+            else:
+                connection.execute(text("DROP VIEW IF EXISTS project_dashboard_mv;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1 FROM project_dashboard_mv LIMIT 1;"))
+            return True
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("项目看板视图已存在")
+    else:
+        print("开始创建项目看板视图...")
+        upgrade()
+
+    print("=" * 50)
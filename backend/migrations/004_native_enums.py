@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 004 状态类字段改为原生枚举
+项目/任务状态、优先级、文件类型、财务类型由VARCHAR改为PostgreSQL ENUM (固定4字节)，
+索引叶子节点更小，看板和列表过滤的索引更容易常驻缓存
+"""
+
+import importlib
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine
+from app.models import (
+    PROJECT_STATUS_ENUM, TASK_STATUS_ENUM, PRIORITY_ENUM, FILE_TYPE_ENUM, FINANCIAL_TYPE_ENUM
+)
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "004"
+MIGRATION_NAME = "native_enums"
+MIGRATION_DESCRIPTION = "状态类字段改为原生枚举 (仅PostgreSQL)"
+
+# (表名, 列名, 枚举类型)
+ENUM_COLUMNS = [
+    ("projects", "status", PROJECT_STATUS_ENUM),
+    ("projects", "priority", PRIORITY_ENUM),
+    ("tasks", "status", TASK_STATUS_ENUM),
+    ("tasks", "priority", PRIORITY_ENUM),
+    ("project_files", "file_type", FILE_TYPE_ENUM),
+    ("financial_records", "record_type", FINANCIAL_TYPE_ENUM),
+]
+
+def _dashboard_view():
+    """003迁移中的看板视图 (依赖 projects.status / tasks.status，改类型前需先删除)"""
+    return importlib.import_module("migrations.003_project_dashboard_view")
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        print("⏭️  非PostgreSQL数据库，跳过 (新建表由模型直接生成ENUM/VARCHAR)")
+        return
+
+    try:
+        with engine.begin() as connection:
+            print("🧩 创建枚举类型...")
+            for _, _, enum_type in ENUM_COLUMNS:
+                enum_type.create(connection, checkfirst=True)
+
+            connection.execute(text("DROP MATERIALIZED VIEW IF EXISTS project_dashboard_mv;"))
+
+            print("📊 转换字段类型...")
+            for table, column, enum_type in ENUM_COLUMNS:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} "
+                    f"TYPE {enum_type.name} USING {column}::{enum_type.name};"
+                ))
+
+        # 重建看板物化视图
+        _dashboard_view().upgrade()
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (恢复为VARCHAR)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        return
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("DROP MATERIALIZED VIEW IF EXISTS project_dashboard_mv;"))
+            for table, column, _ in ENUM_COLUMNS:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} "
+                    f"TYPE VARCHAR(50) USING {column}::text;"
+                ))
+            for _, _, enum_type in ENUM_COLUMNS:
+                enum_type.drop(connection, checkfirst=True)
+
+        _dashboard_view().upgrade()
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    if not settings.is_postgresql:
+        return True
+
+    try:
+        with engine.connect() as connection:
+            data_type = connection.execute(text("""
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = 'projects' AND column_name = 'status';
+            """)).scalar()
+            return data_type == "USER-DEFINED"
+    except Exception as e:
+        print(f"⚠️  无法检查迁移状态: {e}")
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("状态字段已是原生枚举")
+    else:
+        print("开始转换状态字段...")
+        upgrade()
+
+    print("=" * 50)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 005 项目/文件标签列
+新增 tags 列 (PostgreSQL为JSONB + jsonb_path_ops GIN索引，其他数据库为JSON)
+"""
+
+from datetime import datetime
+from sqlalchemy import text, inspect
+from sqlalchemy.schema import CreateIndex
+from app.database import engine
+from app.models import Project, ProjectFile
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "005"
+MIGRATION_NAME = "tags_jsonb"
+MIGRATION_DESCRIPTION = "项目/文件标签列 (PostgreSQL JSONB + GIN索引)"
+
+TAGGED_MODELS = [Project, ProjectFile]
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            for model in TAGGED_MODELS:
+                table = model.__tablename__
+                columns = {column["name"] for column in inspector.get_columns(table)}
+                if "tags" not in columns:
+                    print(f"🏷️  {table} 新增 tags 列...")
+                    column_type = model.__table__.c.tags.type.compile(dialect=connection.dialect)
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN tags {column_type};"))
+
+                if settings.is_postgresql:
+                    for index in model.__table__.indexes:
+                        if index.name.endswith("_tags_gin"):
+                            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+                            connection.execute(text(ddl))
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (删除 tags 列)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            for model in TAGGED_MODELS:
+                # 删除列时GIN索引随之删除
+                connection.execute(text(f"ALTER TABLE {model.__tablename__} DROP COLUMN tags;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        inspector = inspect(engine)
+        return all(
+            "tags" in {column["name"] for column in inspector.get_columns(model.__tablename__)}
+            for model in TAGGED_MODELS
+        )
+    except Exception as e:
+        print(f"⚠️  无法检查迁移状态: {e}")
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("标签列已存在")
+    else:
+        print("开始添加标签列...")
+        upgrade()
+
+    print("=" * 50)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 006 时间戳改为数据库端默认值
+created_at / updated_at / uploaded_at 由数据库生成UTC时间，已有表补充列默认值
+"""
+
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine, Base
+from app.models import utcnow
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "006"
+MIGRATION_NAME = "server_side_timestamps"
+MIGRATION_DESCRIPTION = "时间戳改为数据库端默认值"
+
+def timestamp_columns():
+    """使用 utcnow() 作为数据库端默认值的 (表名, 列名)"""
+    return [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(getattr(column.server_default, "arg", None), utcnow)
+    ]
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            default_sql = str(utcnow().compile(dialect=connection.dialect))
+            for table, column in timestamp_columns():
+                if settings.is_sqlite:
+                    # SQLite不支持修改列默认值，已有表用触发器补齐
+                    connection.execute(text(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_default
+                        AFTER INSERT ON {table} FOR EACH ROW WHEN NEW.{column} IS NULL
+                        BEGIN
+                            UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid;
+                        END;
+                    """))
+                else:
+                    connection.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {default_sql};"
+                    ))
+                print(f"⏱️  {table}.{column}")
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (移除列默认值)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            for table, column in timestamp_columns():
+                if settings.is_sqlite:
+                    connection.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_{column}_default;"))
+                else:
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM migration_history WHERE version = :version;"
+            ), {"version": MIGRATION_VERSION}).first() is not None
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("时间戳默认值已迁移")
+    else:
+        print("开始迁移时间戳默认值...")
+        upgrade()
+
+    print("=" * 50)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 007 updated_at 触发器
+projects / tasks 的 updated_at 改由数据库触发器维护，ORM的UPDATE语句只包含实际变更的列
+"""
+
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine, Base
+from app.models import TOUCH_TABLES, touch_trigger_ddl
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "007"
+MIGRATION_NAME = "updated_at_triggers"
+MIGRATION_DESCRIPTION = "projects/tasks 的 updated_at 改由触发器维护"
+
+def drop_trigger(connection, table: str):
+    """删除已存在的触发器"""
+    if settings.is_postgresql:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_touch ON {table};"))
+    else:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_touch;"))
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            for table in TOUCH_TABLES:
+                drop_trigger(connection, table)
+                # DDL按方言条件执行 (与 create_all 时的 after_create 事件一致)
+                for ddl in touch_trigger_ddl(table):
+                    ddl(Base.metadata.tables[table], connection)
+                print(f"🔄 {table}.updated_at 触发器已创建")
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (删除触发器)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            for table in TOUCH_TABLES:
+                drop_trigger(connection, table)
+            if settings.is_postgresql:
+                connection.execute(text("DROP FUNCTION IF EXISTS set_updated_at();"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM migration_history WHERE version = :version;"
+            ), {"version": MIGRATION_VERSION}).first() is not None
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("updated_at 触发器已创建")
+    else:
+        print("开始创建 updated_at 触发器...")
+        upgrade()
+
+    print("=" * 50)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 008 金额按分存储 + 文件大小BIGINT
+金额列由浮点(元)改为BIGINT(分)，避免浮点误差；file_size 改为BIGINT，支持2GB以上文件
+"""
+
+import importlib
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "008"
+MIGRATION_NAME = "money_cents"
+MIGRATION_DESCRIPTION = "金额按分存储为BIGINT，文件大小改为BIGINT"
+
+# (表名, 列名, 是否允许为空)
+MONEY_COLUMNS = [
+    ("projects", "quoted_price", True),
+    ("projects", "cost_price", True),
+    ("projects", "deposit_amount", True),
+    ("projects", "final_amount", True),
+    ("financial_records", "amount", False),
+]
+
+def _dashboard_view():
+    """003迁移中的看板视图 (依赖金额列，改类型前需先删除)"""
+    return importlib.import_module("migrations.003_project_dashboard_view")
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                connection.execute(text("DROP MATERIALIZED VIEW IF EXISTS project_dashboard_mv;"))
+                for table, column, _ in MONEY_COLUMNS:
+                    connection.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} "
+                        f"TYPE BIGINT USING round({column} * 100)::bigint;"
+                    ))
+                connection.execute(text("ALTER TABLE project_files ALTER COLUMN file_size TYPE BIGINT;"))
+
+            elif settings.is_mysql:
+                for table, column, nullable in MONEY_COLUMNS:
+                    connection.execute(text(f"UPDATE {table} SET {column} = ROUND({column} * 100);"))
+                    null_sql = "NULL" if nullable else "NOT NULL"
+                    connection.execute(text(f"ALTER TABLE {table} MODIFY {column} BIGINT {null_sql};"))
+                connection.execute(text("ALTER TABLE project_files MODIFY file_size BIGINT NULL;"))
+
+            else:
+                # SQLite为动态类型，只需换算已有数据
+                for table, column, _ in MONEY_COLUMNS:
+                    connection.execute(text(
+                        f"UPDATE {table} SET {column} = CAST(ROUND({column} * 100) AS INTEGER);"
+                    ))
+            print("💰 金额已换算为分")
+
+        # 重建看板视图 (金额换算为元)
+        _dashboard_view().upgrade()
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (金额恢复为浮点元)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                connection.execute(text("DROP MATERIALIZED VIEW IF EXISTS project_dashboard_mv;"))
+                for table, column, _ in MONEY_COLUMNS:
+                    connection.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} "
+                        f"TYPE DOUBLE PRECISION USING {column} / 100.0;"
+                    ))
+            elif settings.is_mysql:
+                for table, column, nullable in MONEY_COLUMNS:
+                    null_sql = "NULL" if nullable else "NOT NULL"
+                    connection.execute(text(f"ALTER TABLE {table} MODIFY {column} DOUBLE {null_sql};"))
+                    connection.execute(text(f"UPDATE {table} SET {column} = {column} / 100;"))
+            else:
+                for table, column, _ in MONEY_COLUMNS:
+                    connection.execute(text(f"UPDATE {table} SET {column} = {column} / 100.0;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚 (视图需按旧定义重建)")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM migration_history WHERE version = :version;"
+            ), {"version": MIGRATION_VERSION}).first() is not None
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("金额已按分存储")
+    else:
+        print("开始换算金额...")
+        upgrade()
+
+    print("=" * 50)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 009 AI对话预览列 + 覆盖索引
+新增 preview 生成列 (用户消息前120字)，(wechat_userid, created_at) 索引 INCLUDE 预览字段
+"""
+
+from datetime import datetime
+from sqlalchemy import text, inspect
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from app.database import engine
+from app.models import AIConversation
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "009"
+MIGRATION_NAME = "conversation_preview"
+MIGRATION_DESCRIPTION = "AI对话预览生成列 + 覆盖索引"
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            columns = {column["name"] for column in inspect(connection).get_columns("ai_conversations")}
+            if "preview" not in columns:
+                print("📝 新增 preview 生成列...")
+                column_sql = str(CreateColumn(AIConversation.__table__.c.preview).compile(dialect=connection.dialect))
+                if settings.is_sqlite:
+                    # SQLite的 ALTER TABLE 只能添加 VIRTUAL 生成列
+                    column_sql = column_sql.replace(" STORED", " VIRTUAL")
+                connection.execute(text(f"ALTER TABLE ai_conversations ADD COLUMN {column_sql};"))
+
+            if settings.is_postgresql:
+                print("🔍 重建覆盖索引...")
+                connection.execute(text("DROP INDEX IF EXISTS ix_ai_conversation_user_created;"))
+                for index in AIConversation.__table__.indexes:
+                    if index.name == "ix_ai_conversation_user_created":
+                        connection.execute(text(str(CreateIndex(index).compile(dialect=connection.dialect))))
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (删除预览列)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                connection.execute(text("DROP INDEX IF EXISTS ix_ai_conversation_user_created;"))
+                connection.execute(text("""
+                    CREATE INDEX ix_ai_conversation_user_created
+                    ON ai_conversations (wechat_userid, created_at);
+                """))
+            connection.execute(text("ALTER TABLE ai_conversations DROP COLUMN preview;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        columns = {column["name"] for column in inspect(engine).get_columns("ai_conversations")}
+        return "preview" in columns
+    except Exception as e:
+        print(f"⚠️  无法检查迁移状态: {e}")
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("AI对话预览列已存在")
+    else:
+        print("开始添加AI对话预览列...")
+        upgrade()
+
+    print("=" * 50)
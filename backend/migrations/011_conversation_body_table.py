@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 011 AI对话正文拆分到侧表
+user_message / ai_response 移到 ai_conversations_body (共享主键)，
+主表只保留统计和列表所需的窄字段，preview 由生成列改为写入时截取
+"""
+
+from datetime import datetime
+from sqlalchemy import text, inspect
+from app.database import engine
+from app.models import AIConversationBody, CONVERSATION_PREVIEW_LENGTH
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "011"
+MIGRATION_NAME = "conversation_body_table"
+MIGRATION_DESCRIPTION = "AI对话正文拆分到侧表"
+
+BODY_COLUMNS = ("user_message", "ai_response")
+
+def conversation_columns(connection) -> set:
+    """ai_conversations 当前的列名"""
+    return {column["name"] for column in inspect(connection).get_columns("ai_conversations")}
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            AIConversationBody.__table__.create(connection, checkfirst=True)
+
+            if "user_message" not in conversation_columns(connection):
+                print("✅ 对话正文已拆分")
+            else:
+                # 1. 复制正文
+                print("📝 复制对话正文...")
+                connection.execute(text("""
+                    INSERT INTO ai_conversations_body (id, user_message, ai_response)
+                    SELECT id, user_message, ai_response FROM ai_conversations;
+                """))
+
+                # 2. preview 生成列依赖 user_message，先改为普通列
+                print("🔄 preview 改为普通列...")
+                if settings.is_postgresql:
+                    connection.execute(text(
+                        "ALTER TABLE ai_conversations ALTER COLUMN preview DROP EXPRESSION;"
+                    ))
+                elif settings.is_mysql:
+                    connection.execute(text(
+                        f"ALTER TABLE ai_conversations MODIFY preview VARCHAR({CONVERSATION_PREVIEW_LENGTH}) NULL;"
+                    ))
+                else:
+                    # SQLite不支持修改生成列，删除后重建并回填
+                    connection.execute(text("ALTER TABLE ai_conversations DROP COLUMN preview;"))
+                    connection.execute(text(
+                        f"ALTER TABLE ai_conversations ADD COLUMN preview VARCHAR({CONVERSATION_PREVIEW_LENGTH});"
+                    ))
+                    connection.execute(text(
+                        f"UPDATE ai_conversations SET preview = substr(user_message, 1, {CONVERSATION_PREVIEW_LENGTH});"
+                    ))
+
+                # 3. 删除主表正文列
+                print("🗑️  删除主表正文列...")
+                for column in BODY_COLUMNS:
+                    connection.execute(text(f"ALTER TABLE ai_conversations DROP COLUMN {column};"))
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (正文合并回主表，preview 保持普通列)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            columns = conversation_columns(connection)
+            for column in BODY_COLUMNS:
+                if column not in columns:
+                    connection.execute(text(f"ALTER TABLE ai_conversations ADD COLUMN {column} TEXT;"))
+
+            connection.execute(text("""
+                UPDATE ai_conversations SET
+                    user_message = (SELECT b.user_message FROM ai_conversations_body b WHERE b.id = ai_conversations.id),
+                    ai_response = (SELECT b.ai_response FROM ai_conversations_body b WHERE b.id = ai_conversations.id);
+            """))
+            connection.execute(text("DROP TABLE ai_conversations_body;"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            return "user_message" not in conversation_columns(connection)
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("AI对话正文已拆分")
+    else:
+        print("开始拆分AI对话正文...")
+        upgrade()
+
+    print("=" * 50)
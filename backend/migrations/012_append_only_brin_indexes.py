@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 012 只追加表时间列BRIN索引
+状态日志/项目文件/财务记录按插入时间顺序写入，PostgreSQL下为时间列创建BRIN索引，
+体积远小于btree，时间范围扫描只读取命中的数据页段
+"""
+
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from app.database import engine
+from app.models import ProjectStatusLog, ProjectFile, FinancialRecord
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "012"
+MIGRATION_NAME = "append_only_brin_indexes"
+MIGRATION_DESCRIPTION = "只追加表时间列BRIN索引 (仅PostgreSQL)"
+
+def brin_indexes():
+    """模型中声明的BRIN索引"""
+    return [
+        index
+        for model in (ProjectStatusLog, ProjectFile, FinancialRecord)
+        for index in model.__table__.indexes
+        if index.name.endswith("_brin")
+    ]
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        print("⏭️  非PostgreSQL数据库，跳过 (时间范围查询使用已有组合索引)")
+        return
+
+    try:
+        with engine.begin() as connection:
+            for index in brin_indexes():
+                connection.execute(text(str(
+                    CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect)
+                )))
+                print(f"🔍 {index.name}")
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (删除BRIN索引)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    if not settings.is_postgresql:
+        return
+
+    try:
+        with engine.begin() as connection:
+            for index in brin_indexes():
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name};"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    if not settings.is_postgresql:
+        return True
+
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_status_log_created_brin';"
+            )).first() is not None
+    except Exception as e:
+        print(f"⚠️  无法检查迁移状态: {e}")
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("BRIN索引已存在")
+    else:
+        print("开始创建BRIN索引...")
+        upgrade()
+
+    print("=" * 50)
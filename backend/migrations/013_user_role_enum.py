@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 013 用户角色原生枚举
+users.role 原为 SQLEnum(RoleEnum) 按成员名存储 (ADMIN)，改为按枚举值存储 (admin)，
+PostgreSQL下类型由自动生成的 roleenum 改为 user_role，与其他原生枚举一致
+"""
+
+from datetime import datetime
+from sqlalchemy import text
+from app import RoleEnum
+from app.database import engine
+from app.models import ROLE_ENUM
+from config import settings
+
+# 迁移信息
+MIGRATION_VERSION = "013"
+MIGRATION_NAME = "user_role_enum"
+MIGRATION_DESCRIPTION = "用户角色按枚举值存储为原生枚举 user_role"
+
+def _mysql_enum(labels) -> str:
+    """MySQL ENUM 列定义"""
+    return "ENUM(" + ", ".join(f"'{label}'" for label in labels) + ")"
+
+def upgrade():
+    """执行数据库升级"""
+    print(f"🔄 执行迁移 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                print("🧩 创建枚举类型 user_role...")
+                ROLE_ENUM.create(connection, checkfirst=True)
+                connection.execute(text(
+                    "ALTER TABLE users ALTER COLUMN role "
+                    "TYPE user_role USING lower(role::text)::user_role;"
+                ))
+                connection.execute(text("DROP TYPE IF EXISTS roleenum;"))
+
+            elif settings.is_mysql:
+                connection.execute(text("ALTER TABLE users MODIFY role VARCHAR(20) NOT NULL;"))
+                connection.execute(text("UPDATE users SET role = LOWER(role);"))
+                connection.execute(text(
+                    f"ALTER TABLE users MODIFY role {_mysql_enum(role.value for role in RoleEnum)} NOT NULL;"
+                ))
+
+            else:
+                # SQLite为VARCHAR，只需转换已有数据
+                connection.execute(text("UPDATE users SET role = lower(role);"))
+            print("👤 用户角色已转换为枚举值")
+
+        record_migration()
+        print(f"✅ 迁移 {MIGRATION_VERSION} 完成")
+
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        raise
+
+def downgrade():
+    """执行数据库降级 (恢复按成员名存储)"""
+    print(f"⚠️  执行迁移回滚 {MIGRATION_VERSION}: {MIGRATION_NAME}")
+
+    try:
+        with engine.begin() as connection:
+            if settings.is_postgresql:
+                connection.execute(text(
+                    f"CREATE TYPE roleenum AS ENUM ({', '.join(repr(role.name) for role in RoleEnum)});"
+                ))
+                connection.execute(text(
+                    "ALTER TABLE users ALTER COLUMN role "
+                    "TYPE roleenum USING upper(role::text)::roleenum;"
+                ))
+                ROLE_ENUM.drop(connection, checkfirst=True)
+
+            elif settings.is_mysql:
+                connection.execute(text("ALTER TABLE users MODIFY role VARCHAR(20) NOT NULL;"))
+                connection.execute(text("UPDATE users SET role = UPPER(role);"))
+                connection.execute(text(
+                    f"ALTER TABLE users MODIFY role {_mysql_enum(role.name for role in RoleEnum)} NOT NULL;"
+                ))
+
+            else:
+                connection.execute(text("UPDATE users SET role = upper(role);"))
+        print(f"🗑️  迁移 {MIGRATION_VERSION} 已回滚")
+
+    except Exception as e:
+        print(f"❌ 回滚失败: {e}")
+        raise
+
+def record_migration():
+    """记录迁移历史"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO migration_history
+                (version, name, description, executed_at, execution_time)
+                VALUES (:version, :name, :description, :executed_at, :execution_time);
+            """), {
+                "version": MIGRATION_VERSION,
+                "name": MIGRATION_NAME,
+                "description": MIGRATION_DESCRIPTION,
+                "executed_at": datetime.utcnow(),
+                "execution_time": 0.0
+            })
+    except Exception as e:
+        print(f"⚠️  迁移记录警告: {e}")
+
+def check_migration_status():
+    """检查迁移状态"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM migration_history WHERE version = :version;"
+            ), {"version": MIGRATION_VERSION}).first() is not None
+    except Exception:
+        return False
+
+def get_migration_info():
+    """获取迁移信息"""
+    return {
+        "version": MIGRATION_VERSION,
+        "name": MIGRATION_NAME,
+        "description": MIGRATION_DESCRIPTION,
+        "upgrade_function": upgrade,
+        "downgrade_function": downgrade,
+        "check_function": check_migration_status
+    }
+
+if __name__ == "__main__":
+    """直接运行迁移脚本"""
+    print("🔧 AI管理系统数据库迁移工具")
+    print("=" * 50)
+
+    if check_migration_status():
+        print("用户角色已按枚举值存储")
+    else:
+        print("开始转换用户角色...")
+        upgrade()
+
+    print("=" * 50)
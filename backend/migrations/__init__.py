@@ -15,6 +15,78 @@ MIGRATION_HISTORY = [
         "name": "init_tables", 
         "description": "创建初始数据表结构",
         "created_at": "2024-01-01"
+    },
+    {
+        "version": "002",
+        "name": "ai_conversation_partitions",
+        "description": "AI对话表按月分区 (仅PostgreSQL)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "003",
+        "name": "project_dashboard_view",
+        "description": "项目看板汇总视图 (PostgreSQL物化视图)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "004",
+        "name": "native_enums",
+        "description": "状态类字段改为原生枚举 (仅PostgreSQL)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "005",
+        "name": "tags_jsonb",
+        "description": "项目/文件标签列 (PostgreSQL JSONB + GIN索引)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "006",
+        "name": "server_side_timestamps",
+        "description": "时间戳改为数据库端默认值",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "007",
+        "name": "updated_at_triggers",
+        "description": "projects/tasks 的 updated_at 改由触发器维护",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "008",
+        "name": "money_cents",
+        "description": "金额按分存储为BIGINT，文件大小改为BIGINT",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "009",
+        "name": "conversation_preview",
+        "description": "AI对话预览生成列 + 覆盖索引",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "010",
+        "name": "project_search_trgm",
+        "description": "项目搜索三元组索引 (仅PostgreSQL)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "011",
+        "name": "conversation_body_table",
+        "description": "AI对话正文拆分到侧表",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "012",
+        "name": "append_only_brin_indexes",
+        "description": "只追加表时间列BRIN索引 (仅PostgreSQL)",
+        "created_at": "2026-10-15"
+    },
+    {
+        "version": "013",
+        "name": "user_role_enum",
+        "description": "用户角色按枚举值存储为原生枚举 user_role",
+        "created_at": "2026-10-15"
     }
     # 后续迁移将在这里添加
 ]
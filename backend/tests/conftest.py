@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 测试公共夹具
+每个测试使用独立的内存SQLite数据库
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import config
+
+# app/config.py 目前只有待合并的字段片段，测试中 app.config 指向根目录配置
+sys.modules.setdefault("app.config", config)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import RoleEnum
+from app.database import Base
+from app.models import User
+
+@pytest.fixture
+def engine():
+    """内存数据库引擎 (StaticPool 保证所有会话共用同一个连接)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    """数据库会话"""
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def admin_user(db):
+    """管理员用户"""
+    user = User(
+        username="admin",
+        password_hash="x",
+        full_name="管理员",
+        role=RoleEnum.ADMIN,
+        is_active=True,
+        is_admin=True
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
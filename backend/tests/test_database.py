@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 数据库工具测试
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import app.database as database
+
+def _operational_error(invalidated: bool) -> OperationalError:
+    return OperationalError("SELECT 1", {}, Exception("(1213) Deadlock found"), connection_invalidated=invalidated)
+
+@pytest.mark.parametrize("invalidated, disposed", [(False, False), (True, True)])
+def test_get_db_disposes_pool_only_on_disconnect(monkeypatch, invalidated, disposed):
+    calls = []
+    monkeypatch.setattr(database.engine, "dispose", lambda *args, **kwargs: calls.append("dispose"))
+
+    dependency = database.get_db()
+    next(dependency)
+    with pytest.raises(OperationalError):
+        dependency.throw(_operational_error(invalidated))
+
+    assert (calls == ["dispose"]) is disposed
+
+class _FakeConnection:
+    def __init__(self, closed):
+        self._closed = closed
+
+    async def close(self):
+        self._closed.append(self)
+
+class _FakeEngine:
+    """第 fail_at 次 connect() 失败的异步引擎"""
+
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+        self.attempts = 0
+        self.closed = []
+
+    async def connect(self):
+        self.attempts += 1
+        if self.attempts == self.fail_at:
+            raise ConnectionError("too many connections")
+        return _FakeConnection(self.closed)
+
+def test_prewarm_pool_opens_and_returns_connections(monkeypatch):
+    fake_engine = _FakeEngine(fail_at=None)
+    monkeypatch.setattr(database, "async_engine", fake_engine)
+
+    assert asyncio.run(database.prewarm_pool(3)) == 3
+    assert len(fake_engine.closed) == 3
+
+def test_prewarm_pool_closes_opened_connections_on_failure(monkeypatch):
+    fake_engine = _FakeEngine(fail_at=2)
+    monkeypatch.setattr(database, "async_engine", fake_engine)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(database.prewarm_pool(4))
+    assert fake_engine.attempts == 4
+    assert len(fake_engine.closed) == 3
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 数据模型测试
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app import ConfigKeyEnum
+from app.models import SystemConfig, generate_project_number, system_config_cache
+
+@pytest.fixture(autouse=True)
+def fresh_config_cache():
+    """配置缓存是进程级单例，每个测试换了数据库需重新加载"""
+    system_config_cache.invalidate()
+    yield
+    system_config_cache.invalidate()
+
+def test_project_number_uses_default_prefix(db):
+    today = datetime.now().strftime('%Y%m%d')
+
+    assert generate_project_number(db) == f"PRJ{today}001"
+
+def test_project_number_follows_config_prefix(db):
+    today = datetime.now().strftime('%Y%m%d')
+    SystemConfig.set_value(db, ConfigKeyEnum.PROJECT_NUMBER_PREFIX.value, "GG")
+    db.commit()
+
+    assert system_config_cache.get(db, ConfigKeyEnum.PROJECT_NUMBER_PREFIX.value) == "GG"
+    assert generate_project_number(db) == f"GG{today}001"
+
+    # 提交后缓存失效，下次读取拿到新值
+    SystemConfig.set_value(db, ConfigKeyEnum.PROJECT_NUMBER_PREFIX.value, "AD")
+    db.commit()
+
+    assert generate_project_number(db) == f"AD{today}001"
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 权限控制测试
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app import RoleEnum
+import app.permissions as permissions
+from app.models import User
+from app.permissions import (
+    Permission, PermissionAudit, RequirePermission, RequireRole, flush_permission_audit,
+    get_permission_audit_stats, has_all_permissions, has_any_permission, has_permission,
+    has_permission_by_role
+)
+
+# 位图实现之前的角色权限表 (管理员拥有全部权限，未列出的角色没有权限)
+BASELINE_ROLE_PERMISSIONS = {
+    RoleEnum.ADMIN: set(Permission),
+    RoleEnum.DESIGNER: {
+        Permission.USER_READ, Permission.PROJECT_CREATE, Permission.PROJECT_READ,
+        Permission.PROJECT_UPDATE, Permission.PROJECT_STATUS_CHANGE, Permission.TASK_CREATE,
+        Permission.TASK_READ, Permission.TASK_UPDATE, Permission.SUPPLIER_READ,
+        Permission.FILE_UPLOAD, Permission.FILE_READ, Permission.FILE_DELETE,
+        Permission.AI_USE, Permission.REPORT_VIEW,
+    },
+    RoleEnum.FINANCE: {
+        Permission.USER_READ, Permission.PROJECT_READ, Permission.PROJECT_FINANCIAL,
+        Permission.TASK_READ, Permission.SUPPLIER_READ, Permission.FILE_READ,
+        Permission.FINANCIAL_READ, Permission.FINANCIAL_WRITE, Permission.FINANCIAL_CONFIRM,
+        Permission.FINANCIAL_REPORT, Permission.AI_USE, Permission.REPORT_VIEW,
+        Permission.REPORT_EXPORT, Permission.STATISTICS_VIEW,
+    },
+    RoleEnum.SALES: {
+        Permission.USER_READ, Permission.PROJECT_CREATE, Permission.PROJECT_READ,
+        Permission.PROJECT_UPDATE, Permission.PROJECT_ASSIGN, Permission.TASK_READ,
+        Permission.SUPPLIER_READ, Permission.FILE_UPLOAD, Permission.FILE_READ,
+        Permission.AI_USE, Permission.REPORT_VIEW,
+    },
+}
+
+def baseline_has_permission(user: User, permission: Permission) -> bool:
+    """位图实现之前的 has_permission 规则"""
+    if not user.is_active:
+        return False
+    if user.is_admin:
+        return True
+    return permission in BASELINE_ROLE_PERMISSIONS.get(user.role, set())
+
+@pytest.mark.parametrize("role", [RoleEnum.DESIGNER, RoleEnum.DESIGNER.value])
+def test_require_role_accepts_enum_or_value(role):
+    # 刚构造或赋值后未刷新的用户对象，role 可能还是普通字符串
+    user = User(role=role, is_admin=False, is_active=True)
+
+    assert RequireRole(RoleEnum.DESIGNER)(user) is user
+    assert RequireRole(RoleEnum.DESIGNER.value)(user) is user
+
+def test_require_role_rejects_other_role():
+    user = User(role=RoleEnum.SALES.value, is_admin=False, is_active=True)
+
+    with pytest.raises(HTTPException) as exc_info:
+        RequireRole(RoleEnum.DESIGNER)(user)
+    assert exc_info.value.status_code == 403
+
+def test_unknown_permission_fails_closed():
+    user = User(role=RoleEnum.SALES, is_admin=False, is_active=True)
+
+    assert has_permission(user, "project:unknown") is False
+    assert has_permission_by_role(RoleEnum.SALES, "project:unknown") is False
+    assert has_any_permission(user, ["project:unknown", Permission.PROJECT_READ]) is True
+    assert has_all_permissions(user, ["project:unknown", Permission.PROJECT_READ]) is False
+
+@pytest.mark.parametrize("role", list(RoleEnum))
+@pytest.mark.parametrize("is_admin", [False, True])
+@pytest.mark.parametrize("is_active", [False, True])
+def test_has_permission_matches_baseline_table(role, is_admin, is_active):
+    user = User(role=role, is_admin=is_admin, is_active=is_active)
+
+    for permission in Permission:
+        expected = baseline_has_permission(user, permission)
+        assert has_permission(user, permission) is expected, permission
+        assert has_permission(user, permission.value) is expected, permission
+        assert has_any_permission(user, [permission]) is expected, permission
+        assert has_all_permissions(user, [permission]) is expected, permission
+
+@pytest.mark.parametrize("role", list(RoleEnum))
+@pytest.mark.parametrize("is_admin", [False, True])
+def test_require_permission_matches_baseline_table(role, is_admin):
+    # 路由依赖只接收 get_current_active_user 返回的启用用户
+    user = User(role=role, is_admin=is_admin, is_active=True)
+
+    for permission in Permission:
+        dependency = RequirePermission(permission)
+        if baseline_has_permission(user, permission):
+            assert dependency(user) is user
+        else:
+            with pytest.raises(HTTPException):
+                dependency(user)
+
+def test_audit_reports_dropped_records(monkeypatch, capsys):
+    # 队列容量为1且没有写出线程，第二条记录被丢弃
+    monkeypatch.setattr(permissions, "_audit_queue", permissions.Queue(maxsize=1))
+    monkeypatch.setattr(permissions, "_audit_writer", object())
+    monkeypatch.setattr(permissions, "_audit_dropped", 0)
+    monkeypatch.setattr(permissions, "_audit_dropped_reported", 0)
+    user = User(username="sales", role=RoleEnum.SALES, is_admin=False, is_active=True)
+
+    PermissionAudit.log_permission_check(user, Permission.PROJECT_READ, True)
+    PermissionAudit.log_permission_check(user, Permission.PROJECT_DELETE, False)
+
+    assert get_permission_audit_stats() == {"queued": 1, "dropped": 1}
+
+    flush_permission_audit()
+    output = capsys.readouterr().out
+    assert "GRANTED permission project:read" in output
+    assert "dropped 1 records" in output
+    assert get_permission_audit_stats() == {"queued": 0, "dropped": 1}
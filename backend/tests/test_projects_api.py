@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 项目API测试
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import StatusEnum
+from app.api.projects import router
+from app.auth import get_current_active_user
+from app.database import count_queries, get_db
+from app.models import Project
+
+@pytest.fixture
+def client(db, admin_user):
+    """只挂载项目路由的测试客户端，数据库和当前用户使用测试夹具"""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: admin_user
+    return TestClient(app)
+
+@pytest.fixture
+def project(db, admin_user):
+    """已存在的项目"""
+    project = Project(
+        project_number="PRJ20260101001",
+        project_name="门头招牌",
+        customer_name="张三",
+        status=StatusEnum.PENDING_QUOTE,
+        creator_id=admin_user.id
+    )
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    return project
+
+def test_update_project(client, project):
+    response = client.put(f"/projects/{project.id}", json={"project_name": "灯箱"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["data"]["id"] == project.id
+    assert body["data"]["project_name"] == "灯箱"
+
+@pytest.mark.parametrize("params", [{}, {"compact": "true"}])
+def test_list_projects_query_count(client, db, engine, admin_user, params):
+    for number in range(3):
+        db.add(Project(
+            project_number=f"PRJ2026010100{number}",
+            project_name=f"项目{number}",
+            customer_name="张三",
+            creator_id=admin_user.id,
+            designer_id=admin_user.id
+        ))
+    db.commit()
+    db.expunge_all()
+
+    with count_queries(engine) as statements:
+        response = client.get("/projects/", params=params)
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
+    # 总数 + 分页查询 (关联用户和正文一并加载，没有逐行懒加载)
+    assert len(statements) <= 2
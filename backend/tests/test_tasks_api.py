@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI管理系统 - 任务API测试
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.tasks import router
+from app.auth import get_current_active_user
+from app.database import count_queries, get_db
+from app.models import Project, Task
+
+@pytest.fixture
+def client(db, admin_user):
+    """只挂载任务路由的测试客户端，数据库和当前用户使用测试夹具"""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: admin_user
+    return TestClient(app)
+
+@pytest.fixture
+def tasks(db, admin_user):
+    """两个项目下的5个任务"""
+    projects = [
+        Project(
+            project_number=f"PRJ2026010100{number}",
+            project_name=f"项目{number}",
+            customer_name="张三",
+            requirements="需求",
+            creator_id=admin_user.id,
+            designer_id=admin_user.id
+        )
+        for number in range(2)
+    ]
+    db.add_all(projects)
+    db.flush()
+    db.add_all([
+        Task(
+            title=f"任务{number}",
+            project_id=projects[number % 2].id,
+            assignee_id=admin_user.id,
+            creator_id=admin_user.id
+        )
+        for number in range(5)
+    ])
+    db.commit()
+    db.expunge_all()
+
+@pytest.mark.parametrize("path", ["/tasks/", "/tasks/my/tasks"])
+def test_list_tasks_query_count(client, engine, tasks, path):
+    with count_queries(engine) as statements:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data) == 5
+    assert data[0]["project"]["requirements"] == "需求"
+    # 总数 + 分页查询 (所属项目、负责人和项目正文一并加载，没有逐行懒加载)
+    assert len(statements) <= 2